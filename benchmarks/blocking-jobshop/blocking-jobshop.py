@@ -20,26 +20,37 @@ def read_file_as_number_array(filename: str) -> list[int]:
             content = f.read()
     else:
         content = path.read_text()
-    return [int(x) for x in content.strip().split()]
+    # split() without arguments already ignores leading and trailing whitespace:
+    return list(map(int, content.split()))
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
 def define_model(filename: str) -> cp.Model:
     """Define the blocking job shop model."""
-    data = iter(read_file_as_number_array(filename))
+    data = read_file_as_number_array(filename)
     model = cp.Model(name=make_model_name("blocking-jobshop", filename))
 
-    nb_jobs = next(data)
-    nb_machines = next(data)
+    nb_jobs = data[0]
+    nb_machines = data[1]
+    # Position of the next (machine_id, duration) pair in data:
+    pos = 2
 
     # For each machine create an array of operations executed on it:
     machines: list[list[cp.IntervalVar]] = [[] for _ in range(nb_machines)]
@@ -47,16 +58,22 @@ def define_model(filename: str) -> cp.Model:
     # End times of each job:
     ends: list[cp.IntExpr] = []
 
+    # Bind frequently used functions and constants to locals:
+    interval_var = model.interval_var
+    interval_max = cp.IntervalMax
+    last_operation = nb_machines - 1
+
     for i in range(nb_jobs):
         # Previous task in the job:
         prev: cp.IntervalVar | None = None
         for j in range(nb_machines):
-            machine_id = next(data)
-            duration = next(data)
+            machine_id = data[pos]
+            duration = data[pos + 1]
+            pos += 2
             # Variable duration models waiting (blocking) on the machine;
             # last operation doesn't block:
-            max_duration = cp.IntervalMax if j < nb_machines - 1 else duration
-            operation = model.interval_var(
+            max_duration = interval_max if j < last_operation else duration
+            operation = interval_var(
                 length=(duration, max_duration),
                 name=f"J{i + 1}O{j + 1}M{machine_id + 1}",
             )
@@ -6,6 +6,7 @@ capacity must serve customers with known demands, minimizing total travel distan
 
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import optalcp as cp
@@ -25,13 +26,21 @@ forced_nb_vehicles = 0  # 0 means not forced
 objective = "path"
 
 
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
+
+
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
@@ -78,8 +87,8 @@ def define_model(filename: str) -> cp.Model:
             )
             sys.exit(1)
 
-    # Compute the maximum distance in the matrix:
-    max_distance = max(transition_matrix[i][j] for i in range(nb_nodes) for j in range(nb_nodes))
+    # Compute the maximum distance in the matrix (row maxima are computed by the builtin):
+    max_distance = max(map(max, transition_matrix))
     # The horizon doesn't seem to be needed. But let's use it anyway:
     horizon = max_distance * (nb_nodes + nb_vehicles)
 
@@ -90,10 +99,16 @@ def define_model(filename: str) -> cp.Model:
     # From now on, we will index the customers from 0.
     # In the variable names, we index from 2 (because node 1 in the input file is the depot).
     nb_customers = nb_nodes - 1
+    # Distances from the depot to the customers and back (the same for all vehicles):
+    depot_out = transition_matrix[0][1:]
+    depot_in = [transition_matrix[i + 1][0] for i in range(nb_customers)]
+    customer_demands = demands[1:]
 
     model = cp.Model(name=make_model_name("cvrp", filename))
-    # For each customer, we have an array of potential visits by the vehicles:
-    visits: list[list[cp.IntervalVar]] = [[] for _ in range(nb_customers)]
+    # For each vehicle, the array of its potential visits of the customers:
+    vehicle_visits: list[list[cp.IntervalVar]] = []
+    # And the presences of those visits:
+    vehicle_presences: list[list[cp.BoolExpr]] = []
     # For each vehicle, the time of the last visit:
     end_times: list[cp.IntExpr] = []
     # For each vehicle, we compute the max index of a customer served.
@@ -108,24 +123,38 @@ def define_model(filename: str) -> cp.Model:
             model.interval_var(length=visit_duration, name=f"V_{v + 1}_{i + 2}", optional=True)
             for i in range(nb_customers)
         ]
-        # Add my_visits to the visits array:
-        for i in range(nb_customers):
-            visits[i].append(my_visits[i])
+        vehicle_visits.append(my_visits)
 
         model.no_overlap(my_visits, customer_matrix)
 
         # Constraints for the depot:
-        last = model.interval_var(length=0, name=f"last_{v + 1}", end=(0, horizon))
         for i in range(nb_customers):
             # We don't model the initial depot visit at all. It is known to be at time 0.
             # Instead, we increase start_min of all the visits by the transition matrix value:
-            my_visits[i].start_min = transition_matrix[0][i + 1]
-            # The return to depot must be after all visits and respect the transition matrix:
-            my_visits[i].end_before_start(last, transition_matrix[i + 1][0])
-        end_times.append(last.end())
+            my_visits[i].start_min = depot_out[i]
+        # The return to depot must be after all visits and respect the transition matrix.
+        if visit_duration == 0:
+            # Compute the return time directly as max_i { my_visits[i].end() + depot_in[i] }
+            # instead of creating an interval with a precedence from every visit.
+            # Absent visits are ignored by max, and 0 covers an unused vehicle:
+            returns: list[cp.IntExpr | int] = [
+                visit.end() + d for visit, d in zip(my_visits, depot_in)
+            ]
+            returns.append(0)
+            return_time = model.max(returns)
+        else:
+            last = model.interval_var(length=0, name=f"last_{v + 1}", end=(0, horizon))
+            for i in range(nb_customers):
+                my_visits[i].end_before_start(last, depot_in[i])
+            return_time = last.end()
+        end_times.append(return_time)
+
+        # Presence of each visit, shared by the expressions below:
+        presences = [visit.presence() for visit in my_visits]
+        vehicle_presences.append(presences)
 
         # Capacity of the vehicle cannot be exceeded:
-        used = model.sum([my_visits[i].presence() * demands[i + 1] for i in range(nb_customers)])
+        used = model.sum([p * d for p, d in zip(presences, customer_demands)])
         model.enforce(used <= capacity)
         vehicle_usage.append(used)
 
@@ -133,9 +162,7 @@ def define_model(filename: str) -> cp.Model:
         #    max_i { (i+1) * my_visits[i].presence() }
         # There is +1 to distinguish between serving no customer (value 0) and
         # serving just the customer with index 0 (value 1).
-        max_served_customer = model.max(
-            [my_visits[i].presence() * (i + 1) for i in range(nb_customers)]
-        )
+        max_served_customer = model.max([p * (i + 1) for i, p in enumerate(presences)])
         max_served.append(max_served_customer)
 
         if has_direction_symmetry and break_direction_symmetry:
@@ -147,20 +174,24 @@ def define_model(filename: str) -> cp.Model:
             )
             # The route taken in the reverse order is also a solution.
             # So we may insist that the time of this visit is in the first half of the route:
-            model.enforce(time_of_max_served_customer * 2 <= last.end())
+            model.enforce(time_of_max_served_customer * 2 <= return_time)
+
+    # Transpose the presences to get, for each customer, the presences of its
+    # potential visits by the vehicles:
+    visit_presences = [list(presences) for presences in zip(*vehicle_presences)]
 
     for i in range(nb_customers):
         # Every customer must be visited exactly once:
         #    sum_j visits[i][j] == 1
         # We don't need alternative constraint.
-        model.enforce(model.sum([visits[i][v].presence() for v in range(nb_vehicles)]) == 1)
+        model.enforce(model.sum(visit_presences[i]) == 1)
 
     # All the demands must be satisfied by some vehicle. Therefore the sum of
     # their usage must be equal to the total demand. It is a redundant
     # constraint. It allows the solver to see a problem when some vehicles are
     # underused and there is no way to satisfy the remaining demands by the
     # remaining vehicles.
-    total_demand = sum(demands[1:])
+    total_demand = sum(customer_demands)
     model.enforce(model.sum(vehicle_usage) == total_demand)
 
     if break_vehicle_symmetry:
@@ -177,7 +208,7 @@ def define_model(filename: str) -> cp.Model:
             nb_possible_vehicles = nb_customers - i
             nb_forbidden_vehicles = nb_vehicles - nb_possible_vehicles
             for v in range(nb_forbidden_vehicles):
-                visits[i][v].optional = None
+                vehicle_visits[v][i].optional = None
 
     if objective == "makespan":
         model.minimize(model.max(end_times))
@@ -259,8 +290,15 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, input_files[0])
+        for next_filename in input_files[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":
@@ -14,24 +14,27 @@ import json
 import math
 import random
 import sys
-from dataclasses import dataclass, field
+from array import array
+from dataclasses import dataclass
+from heapq import heapify, heappop, heappush, heapreplace
 from pathlib import Path
 
 
-@dataclass
+@dataclass(slots=True)
 class Data:
     """Input jobshop data as read from a file."""
 
     instance: str
     nb_jobs: int
     nb_machines: int
-    durations: list[list[int]]
-    machines: list[list[int]]
+    # Numbers are stored in compact arrays of C ints (one array per job):
+    durations: "list[array[int]]"
+    machines: "list[array[int]]"
     names: list[list[str]]
-    preferences: list[list[int]]  # Random numbers for heuristic randomization
+    preferences: "list[array[int]]"  # Random numbers for heuristic randomization
 
 
-@dataclass
+@dataclass(slots=True)
 class Candidate:
     """A candidate task ready to be scheduled on a machine."""
 
@@ -44,17 +47,7 @@ class Candidate:
     name: str
 
 
-@dataclass
-class Machine:
-    """Represents a machine during heuristic search for a solution."""
-
-    occupied_until: int = 0  # Time when the last already scheduled task ends
-    candidates: list[Candidate] = field(
-        default_factory=list
-    )  # Tasks ready to be scheduled
-
-
-@dataclass
+@dataclass(slots=True)
 class ScheduleTask:
     """A scheduled task with start and end times."""
 
@@ -86,31 +79,22 @@ def read_data(filename: str) -> Data:
         print(f"Error in {instance} data", file=sys.stderr)
         sys.exit(1)
 
-    durations: list[list[int]] = []
-    machines: list[list[int]] = []
-    preferences: list[list[int]] = []
+    durations: list[array[int]] = []
+    machines: list[array[int]] = []
+    preferences: list[array[int]] = []
     names: list[list[str]] = []
 
     for j in range(nb_jobs):
-        data_line = lines[j + 1].split()
-        nb_tasks = len(data_line) // 2
-        job_durations: list[int] = []
-        job_machines: list[int] = []
-        job_preferences: list[int] = []
-        job_names: list[str] = []
-
-        for r in range(nb_tasks):
-            machine_id = int(data_line[2 * r])
-            duration = int(data_line[2 * r + 1])
-            job_machines.append(machine_id)
-            job_durations.append(duration)
-            job_preferences.append(0)
-            job_names.append(f"J{j + 1}O{r + 1}M{machine_id + 1}")
+        data_line = array("i", map(int, lines[j + 1].split()))
+        # Machine IDs and durations alternate on the line:
+        job_machines = data_line[0::2]
+        job_durations = data_line[1::2]
+        nb_tasks = len(job_machines)
 
         durations.append(job_durations)
         machines.append(job_machines)
-        preferences.append(job_preferences)
-        names.append(job_names)
+        preferences.append(array("i", [0]) * nb_tasks)
+        names.append([f"J{j + 1}O{r + 1}M{job_machines[r] + 1}" for r in range(nb_tasks)])
 
     return Data(
         instance=instance,
@@ -123,12 +107,30 @@ def read_data(filename: str) -> Data:
     )
 
 
-def update_candidates(m: Machine) -> None:
-    """Update candidate heuristic values and sort by heuristic value."""
-    for c in m.candidates:
-        c.min_end = max(m.occupied_until + c.duration, c.min_end)
-        c.heuristic_value = c.min_end + c.preference
-    m.candidates.sort(key=lambda c: c.heuristic_value)
+# Candidates of a machine are a min-heap of (heuristic_value, job, candidate).
+# The job number breaks ties (a job has at most one candidate at a time).
+CandidateHeap = list[tuple[int, int, Candidate]]
+
+
+def update_candidates(heap: CandidateHeap, occupied_until: int) -> float:
+    """
+    Update heuristic value of the best candidate on a machine occupied until
+    the given time. Returns the heuristic value of the best candidate (or
+    infinity if there are no candidates).
+
+    Heuristic values can only grow when occupied_until advances. Therefore, the
+    entries in the heap are lower bounds, and it is enough to keep the root up
+    to date. Other candidates are updated lazily once they get to the root.
+    """
+    while heap:
+        heuristic_value, job, c = heap[0]
+        min_end = occupied_until + c.duration
+        if min_end <= c.min_end:
+            return heuristic_value  # The root is up to date
+        c.min_end = min_end
+        c.heuristic_value = min_end + c.preference
+        heapreplace(heap, (c.heuristic_value, job, c))
+    return math.inf
 
 
 def heuristics(data: Data, best_makespan: float) -> tuple[int, bool]:
@@ -138,107 +140,127 @@ def heuristics(data: Data, best_makespan: float) -> tuple[int, bool]:
     If the solution is better than best_makespan, outputs it in JSON format.
     Returns the makespan and whether a new best was found.
     """
-    machines_state = [Machine() for _ in range(data.nb_machines)]
+    nb_machines = data.nb_machines
+    durations = data.durations
+    preferences = data.preferences
+    machines = data.machines
+    names = data.names
+
+    # State of the machines during the search, stored as parallel arrays indexed
+    # by machine. Time when the last already scheduled task ends:
+    occupied_until = [0] * nb_machines
+    # Tasks ready to be scheduled:
+    candidates: list[CandidateHeap] = [[] for _ in range(nb_machines)]
+    # Heuristic value of the best candidate (infinity if there is none):
+    head_values: list[float] = [math.inf] * nb_machines
 
     # Initial candidates are first operations of all jobs
     for j in range(data.nb_jobs):
-        duration = data.durations[j][0]
-        preference = data.preferences[j][0]
-        m = data.machines[j][0]
-        name = data.names[j][0]
-        machines_state[m].candidates.append(
-            Candidate(
-                heuristic_value=duration + preference,
-                min_end=duration,
-                duration=duration,
-                job=j,
-                operation=0,
-                preference=preference,
-                name=name,
-            )
+        duration = durations[j][0]
+        preference = preferences[j][0]
+        m = machines[j][0]
+        name = names[j][0]
+        c = Candidate(
+            heuristic_value=duration + preference,
+            min_end=duration,
+            duration=duration,
+            job=j,
+            operation=0,
+            preference=preference,
+            name=name,
         )
+        candidates[m].append((c.heuristic_value, j, c))
 
-    # Sort candidates by heuristic value
-    for m in range(data.nb_machines):
-        update_candidates(machines_state[m])
+    # Order candidates by heuristic value
+    for m in range(nb_machines):
+        heapify(candidates[m])
+        if candidates[m]:
+            head_values[m] = candidates[m][0][0]
+
+    # Priority queue of (head value, machine) to find the machine with the best
+    # candidate. When head value of a machine changes, a new entry is pushed and
+    # the outdated one is skipped once it gets to the top:
+    machine_queue = [(head_values[m], m) for m in range(nb_machines) if candidates[m]]
+    heapify(machine_queue)
 
     schedule: list[ScheduleTask] = []
 
-    while True:
+    # When the queue is empty, there are no more candidates: everything is scheduled
+    while machine_queue:
         # Find candidate with smallest heuristic value across all machines
-        min_heuristic_value = math.inf
-        chosen_machine = -1
-
-        for m in range(data.nb_machines):
-            if not machines_state[m].candidates:
-                continue  # No more candidates on this machine
-            c = machines_state[m].candidates[0]
-            if c.heuristic_value < min_heuristic_value:
-                min_heuristic_value = c.heuristic_value
-                chosen_machine = m
-
-        if min_heuristic_value == math.inf:
-            break  # No more candidates, everything is scheduled
+        head_value, chosen_machine = heappop(machine_queue)
+        if head_value != head_values[chosen_machine]:
+            continue  # Outdated entry
 
         # Schedule the selected candidate
-        machine = machines_state[chosen_machine]
-        candidate = machine.candidates.pop(0)
-        schedule.append(
-            ScheduleTask(
-                start=candidate.min_end - candidate.duration,
-                end=candidate.min_end,
-                name=candidate.name,
-            )
-        )
-        machine.occupied_until = candidate.min_end
-        update_candidates(machine)
+        _, _, candidate = heappop(candidates[chosen_machine])
+        end = candidate.min_end
+        schedule.append(ScheduleTask(start=end - candidate.duration, end=end, name=candidate.name))
+        occupied_until[chosen_machine] = end
+        head_value = update_candidates(candidates[chosen_machine], end)
+        head_values[chosen_machine] = head_value
+        if head_value != math.inf:
+            heappush(machine_queue, (head_value, chosen_machine))
 
         # Successor of the selected candidate becomes a candidate
         job = candidate.job
         next_operation = candidate.operation + 1
-        if next_operation < len(data.durations[job]):
-            duration = data.durations[job][next_operation]
-            preference = data.preferences[job][next_operation]
-            name = data.names[job][next_operation]
-            min_end = candidate.min_end + duration
-            m = data.machines[job][next_operation]
-            machines_state[m].candidates.append(
-                Candidate(
-                    heuristic_value=min_end + preference,
-                    min_end=min_end,
-                    duration=duration,
-                    job=job,
-                    operation=next_operation,
-                    preference=preference,
-                    name=name,
-                )
+        job_durations = durations[job]
+        if next_operation < len(job_durations):
+            duration = job_durations[next_operation]
+            preference = preferences[job][next_operation]
+            name = names[job][next_operation]
+            m = machines[job][next_operation]
+            # Occupancy of machine m doesn't change, so the other candidates of m
+            # remain up to date. It is enough to compute min_end of the new one:
+            min_end = max(end, occupied_until[m]) + duration
+            heuristic_value = min_end + preference
+            c = Candidate(
+                heuristic_value=heuristic_value,
+                min_end=min_end,
+                duration=duration,
+                job=job,
+                operation=next_operation,
+                preference=preference,
+                name=name,
             )
-            update_candidates(machines_state[m])
+            heappush(candidates[m], (heuristic_value, job, c))
+            if heuristic_value < head_values[m]:
+                head_values[m] = heuristic_value
+                heappush(machine_queue, (heuristic_value, m))
 
     # Compute makespan of the schedule
     makespan = max(t.end for t in schedule) if schedule else 0
 
     found_better = False
     if makespan < best_makespan:
-        # Output the schedule in JSON format
-        output = {
-            "makespan": makespan,
-            "schedule": [
-                {"name": t.name, "start": t.start, "end": t.end} for t in schedule
-            ],
-        }
-        print(json.dumps(output), flush=True)
+        # Output the schedule in JSON format. Task names are generated by read_data
+        # and contain nothing to escape, so we can format the JSON directly instead
+        # of building a dict for every task and passing it to json.dumps:
+        tasks = ", ".join(
+            f'{{"name": "{t.name}", "start": {t.start}, "end": {t.end}}}' for t in schedule
+        )
+        print(f'{{"makespan": {makespan}, "schedule": [{tasks}]}}', flush=True)
         found_better = True
 
     return makespan, found_better
 
 
+# How often (in number of restarts) to check for solutions from the solver:
+STDIN_POLL_INTERVAL = 8
+
+
 def main() -> None:
-    if len(sys.argv) != 2:
-        print("Usage: python jobshop-heuristics.py <filename>", file=sys.stderr)
+    args = sys.argv[1:]
+    # Optional seed of the random generator (different seeds for parallel processes):
+    if len(args) == 3 and args[0] == "--seed":
+        random.seed(int(args[1]))
+        args = args[2:]
+    if len(args) != 1:
+        print("Usage: python jobshop-heuristics.py [--seed <number>] <filename>", file=sys.stderr)
         sys.exit(1)
 
-    filename = sys.argv[1]
+    filename = args[0]
     data = read_data(filename)
 
     # Best makespan found so far (by this process or received from solver)
@@ -252,23 +274,28 @@ def main() -> None:
 
     # Compute max duration of all tasks
     max_duration = max(d for job in data.durations for d in job)
+    # Preferences are random numbers from 0 to max_duration - 1:
+    preference_range = range(max_duration)
 
     # Infinite loop - we expect to be killed by parent process
+    nb_restarts = 0
     while True:
-        # Check for input from solver (non-blocking)
-        while select.select([sys.stdin], [], [], 0)[0]:
-            try:
-                line = sys.stdin.readline()
-                if line:
-                    external = json.loads(line)
-                    best_makespan = min(best_makespan, external["makespan"])
-            except (json.JSONDecodeError, KeyError):
-                pass  # Ignore malformed input
-
-        # Randomize the preferences
+        # Check for input from solver (non-blocking), but only every few restarts.
+        # A slightly outdated best makespan only means that we may send a useless solution.
+        nb_restarts += 1
+        if nb_restarts % STDIN_POLL_INTERVAL == 0:
+            while select.select([sys.stdin], [], [], 0)[0]:
+                try:
+                    line = sys.stdin.readline()
+                    if line:
+                        external = json.loads(line)
+                        best_makespan = min(best_makespan, external["makespan"])
+                except (json.JSONDecodeError, KeyError):
+                    pass  # Ignore malformed input
+
+        # Randomize the preferences (one batch of random numbers per job)
         for job_prefs in data.preferences:
-            for i in range(len(job_prefs)):
-                job_prefs[i] = random.randint(0, max_duration - 1)
+            job_prefs[:] = array("i", random.choices(preference_range, k=len(job_prefs)))
 
         makespan, _ = heuristics(data, best_makespan)
         best_makespan = min(best_makespan, makespan)
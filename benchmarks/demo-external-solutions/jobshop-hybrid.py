@@ -11,6 +11,7 @@ See README.md for more details.
 import asyncio
 import gzip
 import json
+import os
 import re
 import signal
 import sys
@@ -27,26 +28,37 @@ def read_file_as_number_array(filename: str) -> list[int]:
             content = f.read()
     else:
         content = path.read_text()
-    return [int(x) for x in content.strip().split()]
+    # split() without arguments already ignores leading and trailing whitespace:
+    return list(map(int, content.split()))
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(filename: str) -> str:
     """Generate model identifier from filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"jobshop_{instance}"
 
 
 def define_model(filename: str) -> cp.Model:
     """Define the jobshop scheduling model."""
-    data = iter(read_file_as_number_array(filename))
+    data = read_file_as_number_array(filename)
     model = cp.Model(name=make_model_name(filename))
 
-    nb_jobs = next(data)
-    nb_machines = next(data)
+    nb_jobs = data[0]
+    nb_machines = data[1]
+    # Position of the next (machine_id, duration) pair in data:
+    pos = 2
 
     # For each machine, an array of operations executed on it:
     machines: list[list[cp.IntervalVar]] = [[] for _ in range(nb_machines)]
@@ -54,14 +66,16 @@ def define_model(filename: str) -> cp.Model:
     # End times of each job:
     ends: list[cp.IntExpr] = []
 
+    # Bind frequently used function to a local:
+    interval_var = model.interval_var
+
     for i in range(nb_jobs):
         prev: cp.IntervalVar | None = None
         for j in range(nb_machines):
-            machine_id = next(data)
-            duration = next(data)
-            operation = model.interval_var(
-                length=duration, name=f"J{i + 1}O{j + 1}M{machine_id + 1}"
-            )
+            machine_id = data[pos]
+            duration = data[pos + 1]
+            pos += 2
+            operation = interval_var(length=duration, name=f"J{i + 1}O{j + 1}M{machine_id + 1}")
             machines[machine_id].append(operation)
             if prev is not None:
                 prev.end_before_start(operation)
@@ -78,11 +92,27 @@ def define_model(filename: str) -> cp.Model:
     return model
 
 
+def get_int_option(name: str, default: int, args: list[str]) -> int:
+    """Parse an integer option from args list, removing it if found."""
+    if name in args:
+        idx = args.index(name)
+        value = int(args[idx + 1])
+        del args[idx : idx + 2]
+        return value
+    return default
+
+
 async def main() -> None:
-    usage = "Usage: python jobshop-hybrid.py [OPTIONS] INPUT_FILE"
+    usage = (
+        "Usage: python jobshop-hybrid.py [OPTIONS] INPUT_FILE\n\n"
+        "Hybrid options:\n"
+        "  --nbHeuristics <number>  Number of heuristics processes (default: half of the CPUs)"
+    )
     params, rest_args = cp.parse_known_parameters(usage=usage)
 
-    if len(rest_args) != 1:
+    nb_heuristics = get_int_option("--nbHeuristics", max(1, (os.cpu_count() or 1) // 2), rest_args)
+
+    if len(rest_args) != 1 or nb_heuristics <= 0:
         print(usage, file=sys.stderr)
         sys.exit(1)
 
@@ -101,29 +131,35 @@ async def main() -> None:
         assert v.name is not None
         vars_map[v.name] = v
 
-    # Launch the heuristic solver as a child subprocess:
-    print("Starting heuristics subprocess...")
-    heuristics_process = await asyncio.create_subprocess_exec(
-        sys.executable,
-        "jobshop-heuristics.py",
-        filename,
-        stdin=asyncio.subprocess.PIPE,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=None,  # Inherit stderr
-        limit=2**20,  # 1MB buffer for long JSON lines
-    )
-
-    assert heuristics_process.stdout is not None
-    assert heuristics_process.stdin is not None
+    # Launch the heuristic solvers as child subprocesses. The heuristics are
+    # randomized, so each one gets a different seed:
+    print(f"Starting {nb_heuristics} heuristics subprocess(es)...")
+    heuristics_processes: list[asyncio.subprocess.Process] = []
+    for k in range(nb_heuristics):
+        heuristics_process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "jobshop-heuristics.py",
+            "--seed",
+            str(k + 1),
+            filename,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=None,  # Inherit stderr
+            limit=2**20,  # 1MB buffer for long JSON lines
+        )
+        assert heuristics_process.stdout is not None
+        assert heuristics_process.stdin is not None
+        heuristics_processes.append(heuristics_process)
 
     # Task to read solutions from heuristics and send them to solver
-    async def read_heuristics_output() -> None:
+    async def read_heuristics_output(heuristics_process: asyncio.subprocess.Process) -> None:
         assert heuristics_process.stdout is not None
         while True:
             line = await heuristics_process.stdout.readline()
             if not line:
                 break
-            data = json.loads(line.decode())
+            # json.loads accepts bytes directly (no need to decode the line first):
+            data = json.loads(line)
             solution = cp.Solution()
             solution.set_objective(data["makespan"])
             # We assume the solution contains all variables with correct names
@@ -133,6 +169,31 @@ async def main() -> None:
                 solution.set_value(v, t["start"], t["end"])
             solver.send_solution(solution)
 
+    # Solutions for the heuristics are written by separate tasks that wait
+    # until the pipe is drained. The queues are bounded so that a slow heuristics
+    # process cannot make us buffer solutions without limit. Only the recent
+    # solutions matter, so when a queue is full, the oldest one is dropped.
+    heuristics_inputs: list[asyncio.Queue[bytes]] = [
+        asyncio.Queue(maxsize=16) for _ in heuristics_processes
+    ]
+    loop = asyncio.get_running_loop()
+
+    def send_to_heuristics(output: bytes) -> None:
+        for heuristics_input in heuristics_inputs:
+            if heuristics_input.full():
+                heuristics_input.get_nowait()
+            heuristics_input.put_nowait(output)
+
+    # Task to write solutions from the solver to heuristics
+    async def write_heuristics_input(
+        heuristics_process: asyncio.subprocess.Process, heuristics_input: asyncio.Queue[bytes]
+    ) -> None:
+        assert heuristics_process.stdin is not None
+        while True:
+            output = await heuristics_input.get()
+            heuristics_process.stdin.write(output)
+            await heuristics_process.stdin.drain()
+
     # Handler for solutions found by OptalCP
     def on_solution(event: cp.SolutionEvent) -> None:
         solution = event.solution
@@ -146,27 +207,33 @@ async def main() -> None:
             assert start is not None and end is not None and v.name is not None
             schedule.append({"name": v.name, "start": start, "end": end})
         makespan = solution.get_objective()
-        output = json.dumps({"makespan": makespan, "schedule": schedule}) + "\n"
-        assert heuristics_process.stdin is not None
-        heuristics_process.stdin.write(output.encode())
+        # Compact separators make the (potentially long) line shorter:
+        output = json.dumps({"makespan": makespan, "schedule": schedule}, separators=(",", ":"))
+        # The callback doesn't have to run in the event loop thread:
+        loop.call_soon_threadsafe(send_to_heuristics, (output + "\n").encode())
 
     solver.on_solution = on_solution
 
-    # Start reading heuristics output in background
-    reader_task = asyncio.create_task(read_heuristics_output())
+    # Start reading heuristics outputs and writing their inputs in background
+    tasks: list[asyncio.Task[None]] = []
+    for heuristics_process, heuristics_input in zip(heuristics_processes, heuristics_inputs):
+        tasks.append(asyncio.create_task(read_heuristics_output(heuristics_process)))
+        tasks.append(
+            asyncio.create_task(write_heuristics_input(heuristics_process, heuristics_input))
+        )
 
     try:
         # Solve the model
         await solver.solve(model, params)
     finally:
-        # Kill the heuristics process if still running
-        heuristics_process.kill()
-        await heuristics_process.wait()
-        reader_task.cancel()
-        try:
-            await reader_task
-        except asyncio.CancelledError:
-            pass
+        # Kill the heuristics processes if still running
+        for heuristics_process in heuristics_processes:
+            heuristics_process.kill()
+            await heuristics_process.wait()
+        for task in tasks:
+            task.cancel()
+        # The writers may also fail because the pipes were closed by the kill:
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 if __name__ == "__main__":
@@ -5,10 +5,12 @@ and each job is assigned to exactly one of multiple factories.
 Permutation variant: jobs are processed in the same order on all machines within a factory.
 """
 
+import asyncio
 import gzip
 import re
 import sys
 from pathlib import Path
+from typing import Iterator
 
 import optalcp as cp
 
@@ -21,30 +23,36 @@ permutation = True
 symmetry_breaking = True
 
 
-def read_file_as_number_array(filename: str) -> list[int]:
-    """Read a file and parse whitespace-separated numbers."""
+def iter_numbers(filename: str) -> Iterator[int]:
+    """Read a file and parse whitespace-separated numbers, line by line."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            content = f.read()
-    else:
-        content = path.read_text()
-    return [int(x) for x in content.strip().split()]
+    # Numbers are generated while reading, the whole file is never kept in memory:
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        for line in f:
+            yield from map(int, line.split())
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
 def define_model(filename: str) -> cp.Model:
     """Define the distributed flowshop model."""
-    data = iter(read_file_as_number_array(filename))
+    data = iter_numbers(filename)
     model = cp.Model(name=make_model_name("distributed-flowshop", filename))
 
     nb_jobs = next(data)
@@ -59,10 +67,16 @@ def define_model(filename: str) -> cp.Model:
     # ends[j] = end time of job j (for makespan)
     ends: list[cp.IntExpr] = []
     # For symmetry breaking: job_numbers[f][j] = j if job j assigned to factory f, else 0
+    # The term for job 0 is always 0 and so it is omitted. The last factory is
+    # not needed (it always gets the last job, see below).
     job_numbers: list[list[cp.IntExpr]] = [[] for _ in range(nb_factories)]
     # For --redundantCumul: sum_machines[m] = cumulative pulses on machine m
     sum_machines: list[list[cp.CumulExpr]] = [[] for _ in range(nb_machines)]
 
+    # Bind frequently used functions to locals:
+    interval_var = model.interval_var
+    enforce = model.enforce
+
     for j in range(nb_jobs):
         # Read processing times for this job
         lengths: list[int] = []
@@ -76,9 +90,7 @@ def define_model(filename: str) -> cp.Model:
         alternatives: list[list[cp.IntervalVar]] = []
         if redundant_cumul:
             for m in range(nb_machines):
-                main.append(
-                    model.interval_var(length=lengths[m], name=f"J{j + 1}M{m + 1}")
-                )
+                main.append(interval_var(length=lengths[m], name=f"J{j + 1}M{m + 1}"))
                 alternatives.append([])
 
         # Create operations for this job in each factory
@@ -88,7 +100,7 @@ def define_model(filename: str) -> cp.Model:
             first: cp.IntervalVar | None = None
 
             for m in range(nb_machines):
-                operation = model.interval_var(
+                operation = interval_var(
                     optional=True,
                     length=lengths[m],
                     name=f"J{j + 1}F{f + 1}M{m + 1}",
@@ -102,21 +114,24 @@ def define_model(filename: str) -> cp.Model:
                     prev.end_before_start(operation)
                     assert first is not None
                     # All operations of a job in a factory share the same presence
-                    model.enforce(first.presence() == operation.presence())
+                    enforce(first.presence() == operation.presence())
                 else:
                     first = operation
                 prev = operation
 
             assert first is not None and prev is not None
 
-            presences.append(first.presence())
-            job_numbers[f].append(first.presence() * j)
+            # The presence of the job in the factory (shared by all its operations):
+            presence = first.presence()
+            presences.append(presence)
+            if symmetry_breaking and j > 0 and f < nb_factories - 1:
+                job_numbers[f].append(presence * j)
             if not redundant_cumul:
                 ends.append(prev.end())
 
             # Symmetry breaking: last job must be in last factory
             if symmetry_breaking and j == nb_jobs - 1 and f == nb_factories - 1:
-                model.enforce(first.presence() == 1)
+                enforce(presence == 1)
 
         if redundant_cumul:
             # Alternative: exactly one factory is chosen for each machine
@@ -126,7 +141,7 @@ def define_model(filename: str) -> cp.Model:
             ends.append(main[nb_machines - 1].end())
         else:
             # Each job must be assigned to exactly one factory
-            model.enforce(model.sum(presences) == 1)
+            enforce(model.sum(presences) == 1)
 
     # Objective: minimize makespan
     model.minimize(model.max(ends))
@@ -148,11 +163,7 @@ def define_model(filename: str) -> cp.Model:
             ]
             for m in range(nb_machines):
                 for j in range(nb_jobs):
-                    model.enforce(
-                        positions[j].identity(
-                            operations[f][m][j].position(machines[f][m])
-                        )
-                    )
+                    enforce(positions[j].identity(operations[f][m][j].position(machines[f][m])))
 
     # Redundant cumulative: at most nb_factories jobs on each machine simultaneously
     if redundant_cumul:
@@ -161,24 +172,51 @@ def define_model(filename: str) -> cp.Model:
 
     # Symmetry breaking: order factories by highest job number assigned
     if symmetry_breaking:
-        max_job_in_f = [model.max(job_numbers[f]) for f in range(nb_factories)]
+        # With a single job there are no terms at all, the maximum is then 0:
+        max_job_in_f = [model.max(job_numbers[f] or [0]) for f in range(nb_factories - 1)]
         for f in range(1, nb_factories - 1):
             model.enforce(max_job_in_f[f - 1] < max_job_in_f[f])
 
     return model
 
 
+def get_int_option(name: str, default: int, args: list[str]) -> int:
+    """Parse an integer option from args list, removing it if found."""
+    if name in args:
+        idx = args.index(name)
+        value = int(args[idx + 1])
+        del args[idx : idx + 2]
+        return value
+    return default
+
+
+async def solve_in_parallel(
+    input_files: list[str], params: cp.Parameters, nb_parallel_runs: int
+) -> None:
+    """Solve the input files, with at most nb_parallel_runs solves running at the same time."""
+    # Each solver runs in its own process, the event loop only waits for them:
+    semaphore = asyncio.Semaphore(nb_parallel_runs)
+
+    async def solve(filename: str) -> None:
+        async with semaphore:
+            await cp.Solver().solve(define_model(filename), params)
+
+    await asyncio.gather(*(solve(filename) for filename in input_files))
+
+
 def main() -> None:
     global redundant_cumul, permutation, symmetry_breaking
 
     usage = (
         "Usage: python distributed-flowshop.py [OPTIONS] INPUT_FILE [INPUT_FILE2] ..\n\n"
         "Distributed flowshop options:\n"
-        "  --redundantCumul      Use alternative() with redundant cumulative\n"
-        "  --no-permutation      Disable permutation constraint\n"
-        "  --no-symmetryBreaking Disable symmetry breaking constraints"
+        "  --redundantCumul           Use alternative() with redundant cumulative\n"
+        "  --no-permutation           Disable permutation constraint\n"
+        "  --no-symmetryBreaking      Disable symmetry breaking constraints\n"
+        "  --nbParallelRuns <number>  Number of input files solved in parallel (default: 1)"
     )
     params, rest_args = cp.parse_known_parameters(usage=usage)
+    nb_parallel_runs = get_int_option("--nbParallelRuns", 1, rest_args)
 
     input_files: list[str] = []
     for arg in rest_args:
@@ -196,8 +234,11 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    if nb_parallel_runs > 1:
+        asyncio.run(solve_in_parallel(input_files, params, nb_parallel_runs))
+    else:
+        for filename in input_files:
+            define_model(filename).solve(params)
 
 
 if __name__ == "__main__":
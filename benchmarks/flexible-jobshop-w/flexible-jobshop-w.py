@@ -19,10 +19,12 @@ Reference: Hutter et al. "A Benchmarking Environment for Worker Flexibility
 in Flexible Job Shop Scheduling Problems", arXiv:2501.16159, 2025.
 """
 
+import asyncio
 import gzip
 import re
 import sys
 from pathlib import Path
+from typing import Iterator
 
 import optalcp as cp
 
@@ -32,34 +34,39 @@ redundant_cumul = False
 verbose = False
 
 
-def read_file(filename: str) -> str:
-    """Read a file, decompressing if .gz."""
+def read_lines(filename: str) -> Iterator[str]:
+    """Read a file line by line, decompressing if .gz."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            return f.read()
-    return path.read_text()
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        yield from f
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
 def define_model(filename: str) -> cp.Model:
     """Define the FJSSP-W model."""
-    input_text = read_file(filename)
+    lines = read_lines(filename)
 
     # Parse first line: <nbJobs> <nbMachines> <nbWorkers> [(avgMachinesPerOp)]
-    first_eol = input_text.index("\n")
-    first_line = re.sub(r"[()]", "", input_text[:first_eol]).split()
-    rest = input_text[first_eol + 1 :].split()
-    data = iter(int(x) for x in rest)
+    first_line = re.sub(r"[()]", "", next(lines)).split()
+    # The rest of the file is parsed while reading (no need to keep it in memory):
+    data = (int(x) for line in lines for x in line.split())
 
     model = cp.Model(name=make_model_name("flexible-jobshop-w", filename))
     nb_jobs = int(first_line[0])
@@ -78,6 +85,14 @@ def define_model(filename: str) -> cp.Model:
 
     # For --redundantCumul: cumulative pulses across all operations
     all_operations: list[cp.CumulExpr] = []
+    # Operations of a job never overlap. So when the capacity is at least the
+    # number of jobs, the redundant cumul cannot prune anything and it is not created:
+    cumul_capacity = min(nb_machines, nb_workers)
+    add_redundant_cumul = redundant_cumul and nb_jobs > cumul_capacity
+
+    # Bind frequently used functions to locals:
+    interval_var = model.interval_var
+    alternative = model.alternative
 
     for i in range(nb_jobs):
         nb_operations = next(data)
@@ -85,58 +100,76 @@ def define_model(filename: str) -> cp.Model:
         prev: cp.IntervalVar | None = None
         for j in range(nb_operations):
             # Create a new operation (master of alternative constraint):
-            operation = model.interval_var(name=f"J{i + 1}O{j + 1}")
-            if redundant_cumul:
+            operation = interval_var(name=f"J{i + 1}O{j + 1}")
+            if add_redundant_cumul:
                 all_operations.append(operation.pulse(1))
             nb_machine_choices = next(data)
             modes: list[cp.IntervalVar] = []
-            variants_on_worker: list[list[cp.IntervalVar]] = [[] for _ in range(nb_workers)]
-            variants_on_machine: list[list[cp.IntervalVar]] = [[] for _ in range(nb_machines)]
+            # Where to put the modes of each machine and worker. With flat
+            # alternatives directly to the machines and workers:
+            if flat_alternatives:
+                modes_on_machine = machines
+                modes_on_worker = workers
+            else:
+                variants_on_worker: list[list[cp.IntervalVar]] = [[] for _ in range(nb_workers)]
+                variants_on_machine: list[list[cp.IntervalVar]] = [[] for _ in range(nb_machines)]
+                modes_on_machine = variants_on_machine
+                modes_on_worker = variants_on_worker
 
             for _ in range(nb_machine_choices):
                 machine_id = next(data)
                 nb_worker_choices = next(data)
+                # All modes of this machine choice are on the same machine, so
+                # they are collected first and added to the machine at once:
+                machine_modes: list[cp.IntervalVar] = []
                 for _ in range(nb_worker_choices):
                     worker_id = next(data)
                     duration = next(data)
-                    mode = model.interval_var(
+                    mode = interval_var(
                         length=duration,
                         optional=True,
                         name=f"J{i + 1}O{j + 1}_M{machine_id}W{worker_id}",
                     )
-                    if flat_alternatives:
-                        # In the input file machines are counted from 1, we count from 0.
-                        machines[machine_id - 1].append(mode)
-                        workers[worker_id - 1].append(mode)
-                    else:
-                        variants_on_machine[machine_id - 1].append(mode)
-                        variants_on_worker[worker_id - 1].append(mode)
-                    modes.append(mode)
+                    # In the input file workers and machines are counted from 1, we count from 0.
+                    modes_on_worker[worker_id - 1].append(mode)
+                    machine_modes.append(mode)
+                modes_on_machine[machine_id - 1].extend(machine_modes)
+                modes.extend(machine_modes)
 
             if flat_alternatives:
-                model.alternative(operation, modes)
+                alternative(operation, modes)
             else:
+                # A sub-operation is created only for a machine (worker) with
+                # several variants. A single variant is used directly instead.
                 operations_on_machine: list[cp.IntervalVar] = []
                 for m in range(nb_machines):
-                    if variants_on_machine[m]:
-                        sub_operation = model.interval_var(
+                    if len(variants_on_machine[m]) > 1:
+                        sub_operation = interval_var(
                             name=f"J{i + 1}O{j + 1}_M{m + 1}", optional=True
                         )
-                        model.alternative(sub_operation, variants_on_machine[m])
-                        operations_on_machine.append(sub_operation)
-                        machines[m].append(sub_operation)
-                model.alternative(operation, operations_on_machine)
+                        alternative(sub_operation, variants_on_machine[m])
+                    elif variants_on_machine[m]:
+                        sub_operation = variants_on_machine[m][0]
+                    else:
+                        continue
+                    operations_on_machine.append(sub_operation)
+                    machines[m].append(sub_operation)
+                alternative(operation, operations_on_machine)
 
                 operations_on_worker: list[cp.IntervalVar] = []
                 for w in range(nb_workers):
-                    if variants_on_worker[w]:
-                        sub_operation = model.interval_var(
+                    if len(variants_on_worker[w]) > 1:
+                        sub_operation = interval_var(
                             name=f"J{i + 1}O{j + 1}_W{w + 1}", optional=True
                         )
-                        model.alternative(sub_operation, variants_on_worker[w])
-                        operations_on_worker.append(sub_operation)
-                        workers[w].append(sub_operation)
-                model.alternative(operation, operations_on_worker)
+                        alternative(sub_operation, variants_on_worker[w])
+                    elif variants_on_worker[w]:
+                        sub_operation = variants_on_worker[w][0]
+                    else:
+                        continue
+                    operations_on_worker.append(sub_operation)
+                    workers[w].append(sub_operation)
+                alternative(operation, operations_on_worker)
 
             # Operation has a predecessor:
             if prev is not None:
@@ -147,16 +180,19 @@ def define_model(filename: str) -> cp.Model:
         assert prev is not None
         ends.append(prev.end())
 
-    # Tasks on each machine cannot overlap:
+    # Tasks on each machine cannot overlap (a machine or worker with at most one
+    # task doesn't need the constraint):
     for m in range(nb_machines):
-        model.no_overlap(machines[m])
+        if len(machines[m]) > 1:
+            model.no_overlap(machines[m])
     # Tasks on each worker cannot overlap:
     for w in range(nb_workers):
-        model.no_overlap(workers[w])
+        if len(workers[w]) > 1:
+            model.no_overlap(workers[w])
 
     # Redundant cumulative: at most min(nb_machines, nb_workers) operations simultaneously
-    if redundant_cumul:
-        model.enforce(model.sum(all_operations) <= min(nb_machines, nb_workers))
+    if add_redundant_cumul:
+        model.enforce(model.sum(all_operations) <= cumul_capacity)
 
     # Minimize the makespan:
     makespan = model.max(ends)
@@ -169,17 +205,43 @@ def define_model(filename: str) -> cp.Model:
     return model
 
 
+def get_int_option(name: str, default: int, args: list[str]) -> int:
+    """Parse an integer option from args list, removing it if found."""
+    if name in args:
+        idx = args.index(name)
+        value = int(args[idx + 1])
+        del args[idx : idx + 2]
+        return value
+    return default
+
+
+async def solve_in_parallel(
+    input_files: list[str], params: cp.Parameters, nb_parallel_runs: int
+) -> None:
+    """Solve the input files, with at most nb_parallel_runs solves running at the same time."""
+    # Each solver runs in its own process, the event loop only waits for them:
+    semaphore = asyncio.Semaphore(nb_parallel_runs)
+
+    async def solve(filename: str) -> None:
+        async with semaphore:
+            await cp.Solver().solve(define_model(filename), params)
+
+    await asyncio.gather(*(solve(filename) for filename in input_files))
+
+
 def main() -> None:
     global flat_alternatives, redundant_cumul, verbose
 
     usage = (
         "Usage: python flexible-jobshop-w.py [OPTIONS] INPUT_FILE [INPUT_FILE2] ..\n\n"
         "FJSSP-W specific options:\n"
-        "  --flatAlternatives  Don't use hierarchical alternative constraints\n"
-        "  --redundantCumul    Add a redundant cumul constraint\n"
-        "  --verbose           Enable verbose output"
+        "  --flatAlternatives         Don't use hierarchical alternative constraints\n"
+        "  --redundantCumul           Add a redundant cumul constraint\n"
+        "  --verbose                  Enable verbose output\n"
+        "  --nbParallelRuns <number>  Number of input files solved in parallel (default: 1)"
     )
     params, rest_args = cp.parse_known_parameters(usage=usage)
+    nb_parallel_runs = get_int_option("--nbParallelRuns", 1, rest_args)
 
     # Parse FJSSP-W specific options:
     input_files: list[str] = []
@@ -198,8 +260,11 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    if nb_parallel_runs > 1:
+        asyncio.run(solve_in_parallel(input_files, params, nb_parallel_runs))
+    else:
+        for filename in input_files:
+            define_model(filename).solve(params)
 
 
 if __name__ == "__main__":
@@ -6,30 +6,38 @@ Each operation can be processed on one of several machines (flexibility).
 Objective: minimize the makespan (completion time of all jobs).
 """
 
+import asyncio
 import gzip
 import re
 import sys
 from pathlib import Path
+from typing import Iterator
 
 import optalcp as cp
 
 
-def read_file(filename: str) -> str:
-    """Read a file, handling .gz decompression."""
+def read_lines(filename: str) -> Iterator[str]:
+    """Read a file line by line, handling .gz decompression."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            return f.read()
-    return path.read_text()
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        yield from f
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
@@ -39,10 +47,10 @@ redundant_cumul = False
 def define_model(filename: str) -> cp.Model:
     """Define the flexible job shop model."""
     # Parse input file: first line has nbJobs and nbMachines, rest is job data
-    input_text = read_file(filename)
-    first_eol = input_text.index("\n")
-    first_line = [float(x) for x in input_text[:first_eol].strip().split()]
-    data = iter([int(x) for x in input_text[first_eol + 1 :].strip().split()])
+    # The rest of the file is parsed while reading (no need to keep it in memory):
+    lines = read_lines(filename)
+    first_line = [float(x) for x in next(lines).split()]
+    data = (int(x) for line in lines for x in line.split())
 
     model = cp.Model(name=make_model_name("flexible-jobshop", filename))
     nb_jobs = int(first_line[0])
@@ -56,20 +64,27 @@ def define_model(filename: str) -> cp.Model:
 
     # For --redundantCumul: cumulative pulses across all machines
     all_machines: list[cp.CumulExpr] = []
+    # Operations of a job never overlap. So with at least as many machines as
+    # jobs, the redundant cumul cannot prune anything and it is not created:
+    add_redundant_cumul = redundant_cumul and nb_jobs > nb_machines
+
+    # Bind frequently used functions to locals:
+    interval_var = model.interval_var
+    alternative = model.alternative
 
     for i in range(nb_jobs):
         nb_operations = next(data)
         prev: cp.IntervalVar | None = None
         for j in range(nb_operations):
             # Create operation (master interval for alternative constraint):
-            operation = model.interval_var(name=f"J{i + 1}O{j + 1}")
+            operation = interval_var(name=f"J{i + 1}O{j + 1}")
             # Create one optional mode for each machine that can process this operation:
             nb_modes = next(data)
             modes: list[cp.IntervalVar] = []
             for _ in range(nb_modes):
                 machine_id = next(data)
                 duration = next(data)
-                mode = model.interval_var(
+                mode = interval_var(
                     length=duration,
                     optional=True,
                     name=f"J{i + 1}O{j + 1}_M{machine_id}",
@@ -77,22 +92,24 @@ def define_model(filename: str) -> cp.Model:
                 machines[machine_id - 1].append(mode)  # machines are 1-indexed in input
                 modes.append(mode)
             # Exactly one mode must be selected:
-            model.alternative(operation, modes)
+            alternative(operation, modes)
             # Operations within a job must be sequenced:
             if prev is not None:
                 prev.end_before_start(operation)
             prev = operation
-            if redundant_cumul:
+            if add_redundant_cumul:
                 all_machines.append(operation.pulse(1))
         assert prev is not None
         ends.append(prev.end())
 
     # No-overlap: each machine processes one operation at a time
+    # (a machine with at most one operation doesn't need the constraint)
     for m in range(nb_machines):
-        model.no_overlap(machines[m])
+        if len(machines[m]) > 1:
+            model.no_overlap(machines[m])
 
     # Redundant cumulative: at most nbMachines operations simultaneously
-    if redundant_cumul:
+    if add_redundant_cumul:
         model.enforce(model.sum(all_machines) <= nb_machines)
 
     # Minimize makespan (completion time of all jobs):
@@ -105,13 +122,39 @@ def define_model(filename: str) -> cp.Model:
     return model
 
 
+def get_int_option(name: str, default: int, args: list[str]) -> int:
+    """Parse an integer option from args list, removing it if found."""
+    if name in args:
+        idx = args.index(name)
+        value = int(args[idx + 1])
+        del args[idx : idx + 2]
+        return value
+    return default
+
+
+async def solve_in_parallel(
+    input_files: list[str], params: cp.Parameters, nb_parallel_runs: int
+) -> None:
+    """Solve the input files, with at most nb_parallel_runs solves running at the same time."""
+    # Each solver runs in its own process, the event loop only waits for them:
+    semaphore = asyncio.Semaphore(nb_parallel_runs)
+
+    async def solve(filename: str) -> None:
+        async with semaphore:
+            await cp.Solver().solve(define_model(filename), params)
+
+    await asyncio.gather(*(solve(filename) for filename in input_files))
+
+
 def main() -> None:
     usage = (
         "Usage: python flexible-jobshop.py [OPTIONS] INPUT_FILE [INPUT_FILE2] ..\n\n"
         "Flexible JobShop options:\n"
-        "  --redundantCumul    Add a redundant cumul constraint"
+        "  --redundantCumul           Add a redundant cumul constraint\n"
+        "  --nbParallelRuns <number>  Number of input files solved in parallel (default: 1)"
     )
     params, rest_args = cp.parse_known_parameters(usage=usage)
+    nb_parallel_runs = get_int_option("--nbParallelRuns", 1, rest_args)
 
     # Filter out custom arguments
     global redundant_cumul
@@ -127,8 +170,11 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    if nb_parallel_runs > 1:
+        asyncio.run(solve_in_parallel(input_files, params, nb_parallel_runs))
+    else:
+        for filename in input_files:
+            define_model(filename).solve(params)
 
 
 if __name__ == "__main__":
@@ -4,38 +4,47 @@ Job shop with operators: each operation requires both a machine and an operator.
 The number of operators is limited, adding a cumulative resource constraint.
 """
 
+import argparse
+import asyncio
 import gzip
 import re
 import sys
 from pathlib import Path
+from typing import Iterator
 
 import optalcp as cp
 
 
-def read_file_as_number_array(filename: str) -> list[int]:
-    """Read a file and parse whitespace-separated numbers."""
+def iter_numbers(filename: str) -> Iterator[int]:
+    """Read a file and parse whitespace-separated numbers, line by line."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            content = f.read()
-    else:
-        content = path.read_text()
-    return [int(x) for x in content.strip().split()]
+    # Numbers are generated while reading, the whole file is never kept in memory:
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        for line in f:
+            yield from map(int, line.split())
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str, nb_operators: int) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}_{nb_operators}opers"
 
 
 def define_model(filename: str, nb_operators: int) -> cp.Model:
     """Define the job shop with operators model."""
-    data = iter(read_file_as_number_array(filename))
+    data = iter_numbers(filename)
     model = cp.Model(name=make_model_name("jobshop-operators", filename, nb_operators))
 
     nb_jobs = next(data)
@@ -50,18 +59,22 @@ def define_model(filename: str, nb_operators: int) -> cp.Model:
     # Cumulative pulses for operator requirements:
     operator_requirements: list[cp.CumulExpr] = []
 
+    # Bind frequently used functions to locals:
+    interval_var = model.interval_var
+    pulse = model.pulse
+
     for i in range(nb_jobs):
         prev: cp.IntervalVar | None = None
         for j in range(nb_machines):
             machine_id = next(data)
             duration = next(data)
-            operation = model.interval_var(
+            operation = interval_var(
                 length=duration,
                 name=f"J{i + 1}O{j + 1}M{machine_id + 1}",
             )
             machines[machine_id].append(operation)
             # Each operation requires an operator:
-            operator_requirements.append(model.pulse(operation, 1))
+            operator_requirements.append(pulse(operation, 1))
             # Chain with previous operation:
             if prev is not None:
                 prev.end_before_start(operation)
@@ -83,38 +96,51 @@ def define_model(filename: str, nb_operators: int) -> cp.Model:
     return model
 
 
-def get_int_option(name: str, default: int, args: list[str]) -> int:
-    """Parse and remove an integer option from args."""
-    try:
-        index = args.index(name)
-        value = int(args[index + 1])
-        del args[index : index + 2]
-        return value
-    except (ValueError, IndexError):
-        return default
+async def solve_in_parallel(
+    input_files: list[str], params: cp.Parameters, nb_parallel_runs: int, nb_operators: int
+) -> None:
+    """Solve the input files, with at most nb_parallel_runs solves running at the same time."""
+    # Each solver runs in its own process, the event loop only waits for them:
+    semaphore = asyncio.Semaphore(nb_parallel_runs)
+
+    async def solve(filename: str) -> None:
+        async with semaphore:
+            await cp.Solver().solve(define_model(filename, nb_operators), params)
+
+    await asyncio.gather(*(solve(filename) for filename in input_files))
 
 
 def main() -> None:
     usage = (
         "Usage: python jobshop-operators.py --nbOperators <n> [OPTIONS] INPUT_FILE ..\n\n"
         "Jobshop-operators options:\n"
-        "  --nbOperators <number>  Number of available operators (required)"
+        "  --nbOperators <number>     Number of available operators (required)\n"
+        "  --nbParallelRuns <number>  Number of input files solved in parallel (default: 1)"
     )
     params, rest_args = cp.parse_known_parameters(usage=usage)
 
-    nb_operators = get_int_option("--nbOperators", 0, rest_args)
+    # Parse jobshop-operators options, the remaining arguments are input files:
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--nbOperators", type=int, default=0)
+    parser.add_argument("--nbParallelRuns", type=int, default=1)
+    options, input_files = parser.parse_known_args(rest_args)
+    nb_operators: int = options.nbOperators
+    nb_parallel_runs: int = options.nbParallelRuns
 
     if nb_operators <= 0:
         print("Missing or invalid --nbOperators argument.", file=sys.stderr)
         sys.exit(1)
 
-    if not rest_args:
+    if not input_files:
         print(usage, file=sys.stderr)
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in rest_args:
-        define_model(filename, nb_operators).solve(params)
+    if nb_parallel_runs > 1:
+        asyncio.run(solve_in_parallel(input_files, params, nb_parallel_runs, nb_operators))
+    else:
+        for filename in input_files:
+            define_model(filename, nb_operators).solve(params)
 
 
 if __name__ == "__main__":
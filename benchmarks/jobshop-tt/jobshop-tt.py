@@ -5,33 +5,42 @@ operations that must be processed on specific machines in order. Transition
 times between operations on the same machine depend on the operation sequence.
 """
 
+import argparse
+import asyncio
 import gzip
 import math
 import re
 import sys
 from pathlib import Path
+from typing import Iterator
 
 import optalcp as cp
 
 
-def read_file_as_number_array(filename: str) -> list[int]:
-    """Read a file and parse whitespace-separated numbers."""
+def iter_numbers(filename: str) -> Iterator[int]:
+    """Read a file and parse whitespace-separated numbers, line by line."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            content = f.read()
-    else:
-        content = path.read_text()
-    return [int(x) for x in content.strip().split()]
+    # Numbers are generated while reading, the whole file is never kept in memory:
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        for line in f:
+            yield from map(int, line.split())
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
@@ -39,32 +48,63 @@ def make_model_name(benchmark_name: str, filename: str) -> str:
 random_state = 1
 
 
-def random() -> float:
-    """Generate a random number in [0, 1) using xorshift32."""
+def random_numbers(count: int) -> list[float]:
+    """Generate count random numbers in [0, 1) using xorshift32."""
     global random_state
-    random_state ^= (random_state << 13) & 0xFFFFFFFF
-    random_state ^= random_state >> 17
-    random_state ^= (random_state << 5) & 0xFFFFFFFF
-    return (random_state & 0xFFFFFFFF) / 0xFFFFFFFF
+    # The state is kept in a local variable while generating the whole batch:
+    state = random_state
+    numbers: list[float] = []
+    for _ in range(count):
+        state ^= (state << 13) & 0xFFFFFFFF
+        state ^= state >> 17
+        state ^= (state << 5) & 0xFFFFFFFF
+        numbers.append((state & 0xFFFFFFFF) / 0xFFFFFFFF)
+    random_state = state
+    return numbers
 
 
 # Command-line option:
 max_tt = 20  # Maximum transition time (controls random point spread)
 
 
+def make_transition_matrix(
+    xs: list[int], ys: list[int], distances: list[list[int]]
+) -> list[list[int]]:
+    """
+    Create transition times from 2D points given by their coordinates xs and ys
+    (Euclidean distances).
+
+    The coordinates are integers from 0 to max_tt and distances[dx][dy] is the
+    (rounded) distance for the absolute differences dx and dy of the coordinates.
+    """
+    nb_points = len(xs)
+    # The matrix is symmetric with zeros on the diagonal. So we compute only the
+    # upper triangle and copy it to the lower one:
+    matrix = [[0] * nb_points for _ in range(nb_points)]
+    for i in range(nb_points):
+        row = matrix[i]
+        x1 = xs[i]
+        y1 = ys[i]
+        for k in range(i + 1, nb_points):
+            distance = distances[abs(x1 - xs[k])][abs(y1 - ys[k])]
+            row[k] = distance
+            matrix[k][i] = distance
+    return matrix
+
+
 def define_model(filename: str) -> cp.Model:
     """Define the job shop with transition times model."""
     global random_state
 
-    input_data = read_file_as_number_array(filename)
-    data = iter(input_data)
+    data = iter_numbers(filename)
     model = cp.Model(name=make_model_name("jobshop-tt", filename))
 
     nb_jobs = next(data)
     nb_machines = next(data)
 
-    # Seed the PRNG from instance data for reproducibility:
-    random_state = sum(input_data) or 1
+    # The PRNG is seeded by the sum of all numbers in the input file. The data
+    # are not stored, so we sum them up while reading:
+    data_sum = nb_jobs + nb_machines
 
     # For each machine create an array of operations executed on it:
     machines: list[list[cp.IntervalVar]] = [[] for _ in range(nb_machines)]
@@ -72,17 +112,21 @@ def define_model(filename: str) -> cp.Model:
     # End times of each job:
     ends: list[cp.IntExpr] = []
 
+    # Bind frequently used function to a local:
+    interval_var = model.interval_var
+
     for i in range(nb_jobs):
         # Previous task in the job:
         prev: cp.IntervalVar | None = None
         for j in range(nb_machines):
             machine_id = next(data)
             duration = next(data)
+            data_sum += machine_id + duration
             if machine_id >= nb_machines:
                 raise ValueError(
                     f"Invalid machine ID {machine_id} (only {nb_machines} machines)"
                 )
-            operation = model.interval_var(
+            operation = interval_var(
                 length=duration,
                 name=f"J{i + 1}O{j + 1}M{machine_id + 1}",
             )
@@ -96,17 +140,40 @@ def define_model(filename: str) -> cp.Model:
         assert prev is not None
         ends.append(prev.end())
 
+    # Seed the PRNG from instance data for reproducibility (including possible
+    # numbers after the job data):
+    random_state = data_sum + sum(data) or 1
+
+    # Coordinates of the random points are integers from 0 to max_tt. Therefore,
+    # all possible distances can be computed in advance, indexed by absolute
+    # differences of the coordinates:
+    distances = [
+        [round(math.hypot(dx, dy)) for dy in range(max_tt + 1)] for dx in range(max_tt + 1)
+    ]
+
+    # Random points for all machines are generated at once. For each machine
+    # there are nb_jobs points, their x and y coordinates alternate:
+    nb_coordinates = 2 * nb_jobs
+    coordinates = [round(c * max_tt) for c in random_numbers(nb_coordinates * nb_machines)]
+
+    # Transition matrices by the points they were created from. Machines with
+    # the same points (possible with few jobs or a small max_tt) share the
+    # same matrix object:
+    matrices: dict[tuple[int, ...], list[list[int]]] = {}
+
     # Tasks on each machine cannot overlap:
     for j in range(nb_machines):
-        # Create transition times from random 2D points (Euclidean distances):
-        points = [
-            {"x": round(random() * max_tt), "y": round(random() * max_tt)}
-            for _ in range(nb_jobs)
-        ]
-        matrix = [
-            [round(math.hypot(p1["x"] - p2["x"], p1["y"] - p2["y"])) for p2 in points]
-            for p1 in points
-        ]
+        # Create transition times from the random points of the machine. The
+        # coordinates are kept in two separate lists (no object for every point):
+        start = j * nb_coordinates
+        end = start + nb_coordinates
+        points = tuple(coordinates[start:end])
+        matrix = matrices.get(points)
+        if matrix is None:
+            xs = coordinates[start:end:2]
+            ys = coordinates[start + 1 : end : 2]
+            matrix = make_transition_matrix(xs, ys, distances)
+            matrices[points] = matrix
         model.no_overlap(model.sequence_var(machines[j]), matrix)
 
     # Minimize the makespan:
@@ -116,14 +183,18 @@ def define_model(filename: str) -> cp.Model:
     return model
 
 
-def get_int_option(name: str, default: int, args: list[str]) -> int:
-    """Parse an integer option from args list, removing it if found."""
-    if name in args:
-        idx = args.index(name)
-        value = int(args[idx + 1])
-        del args[idx : idx + 2]
-        return value
-    return default
+async def solve_in_parallel(
+    input_files: list[str], params: cp.Parameters, nb_parallel_runs: int
+) -> None:
+    """Solve the input files, with at most nb_parallel_runs solves running at the same time."""
+    # Each solver runs in its own process, the event loop only waits for them:
+    semaphore = asyncio.Semaphore(nb_parallel_runs)
+
+    async def solve(filename: str) -> None:
+        async with semaphore:
+            await cp.Solver().solve(define_model(filename), params)
+
+    await asyncio.gather(*(solve(filename) for filename in input_files))
 
 
 def main() -> None:
@@ -132,20 +203,29 @@ def main() -> None:
     usage = (
         "Usage: python jobshop-tt.py [OPTIONS] INPUT_FILE [INPUT_FILE2] ..\n\n"
         "Jobshop-tt options:\n"
-        "  --maxTT <number>  Maximum transition time (default: 20)"
+        "  --maxTT <number>           Maximum transition time (default: 20)\n"
+        "  --nbParallelRuns <number>  Number of input files solved in parallel (default: 1)"
     )
-    params, input_files = cp.parse_known_parameters(usage=usage)
+    params, rest_args = cp.parse_known_parameters(usage=usage)
 
-    # Parse custom options from remaining args:
-    max_tt = get_int_option("--maxTT", max_tt, input_files)
+    # Parse custom options from remaining args, the rest are input files:
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--maxTT", type=int, default=max_tt)
+    parser.add_argument("--nbParallelRuns", type=int, default=1)
+    options, input_files = parser.parse_known_args(rest_args)
+    max_tt = options.maxTT
+    nb_parallel_runs: int = options.nbParallelRuns
 
     if not input_files:
         print(usage, file=sys.stderr)
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    if nb_parallel_runs > 1:
+        asyncio.run(solve_in_parallel(input_files, params, nb_parallel_runs))
+    else:
+        for filename in input_files:
+            define_model(filename).solve(params)
 
 
 if __name__ == "__main__":
@@ -10,9 +10,12 @@ total capacity limits across the entire project.
 Objective: minimize non-renewable resource overflow (as penalty), then makespan.
 """
 
+import asyncio
 import gzip
 import re
 import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Iterator
 
@@ -36,16 +39,49 @@ def read_file(filename: str) -> str:
     return path.read_text()
 
 
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
+
+
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
+# Lines starting with these prefixes contain only labels (or data not needed by
+# the model, e.g. the horizon) and are skipped by define_model:
+_LABEL_PREFIXES = (
+    "*",
+    "file with basedata",
+    "initial value random generator",
+    "projects",
+    "horizon",
+    "RESOURCE",
+    "- doubly constrained",
+    "PROJECT INFORMATION:",
+    "pronr.",
+    "PRECEDENCE RELATIONS:",
+    "jobnr.",
+    "REQUESTS/DURATIONS",
+    "R 1",
+)
+# Labeled lines with a number the model needs (the number of jobs and resources):
+_RE_LABELED_NUMBER = re.compile(
+    r"(?:jobs *\(incl. supersource/sink \)|- renewable *|- nonrenewable *): *([0-9]*)"
+)
+# Any character that cannot be part of the preprocessed numbers:
+_RE_NOT_NUMBER = re.compile(r"[^ \t0-9]")
+
+
 def skip_expected(data: Iterator[int], expected: int) -> None:
     """Read and verify the next value equals expected."""
     v = next(data)
@@ -57,37 +93,34 @@ def define_model(filename: str) -> cp.Model:
     input_txt = read_file(filename)
     model = cp.Model(name=make_model_name("mmrcpsp", filename))
 
-    has_project_information = bool(re.search(r"PROJECT INFORMATION:", input_txt))
-
-    # Remove text labels from the input file, keeping only numbers:
-    input_txt = re.sub(r"^\*+$", "", input_txt, flags=re.MULTILINE)
-    input_txt = re.sub(r"file with basedata *: .*", "", input_txt)
-    input_txt = re.sub(r"initial value random generator: [0-9]*", "", input_txt)
-    input_txt = re.sub(r"projects +: {2}1", "", input_txt)
-    input_txt = re.sub(r"jobs *\(incl. supersource/sink \):", "", input_txt)
-    input_txt = re.sub(r"RESOURCES", "", input_txt)
-    input_txt = re.sub(r"- renewable *: *([0-9]*) *R", r"\1", input_txt)
-    input_txt = re.sub(r"- nonrenewable *: *([0-9]*) *N", r"\1", input_txt)
-    input_txt = re.sub(r"- doubly constrained *: *0 *D", "", input_txt)
-    input_txt = re.sub(r"horizon[ \t]*:[ \t]*[0-9]*", "", input_txt)
-    input_txt = re.sub(r"PROJECT INFORMATION:", "", input_txt)
-    input_txt = re.sub(r"pronr\. *#jobs rel.date duedate tardcost *MPM-Time", "", input_txt)
-    input_txt = re.sub(r"PRECEDENCE RELATIONS:", "", input_txt)
-    input_txt = re.sub(r"jobnr. *#modes *#successors *successors", "", input_txt)
-    input_txt = re.sub(r"REQUESTS/DURATIONS:?", "", input_txt)
-    input_txt = re.sub(r"jobnr.[ \t]*mode[ \t]*dur(ation)?[ \t]*[ \tNR0-9]*", "", input_txt)
-    input_txt = re.sub(r"^-+$", "", input_txt, flags=re.MULTILINE)
-    input_txt = re.sub(r"RESOURCE ?AVAILABILITIES:?", "", input_txt)
-    input_txt = re.sub(r"^[\t ]*R 1[\t NR0-9]*$", "", input_txt, flags=re.MULTILINE)
+    # Remove text labels from the input file, keeping only numbers. The file is
+    # processed line by line in a single pass:
+    has_project_information = False
+    numbers_txt: list[str] = []
+    for line in input_txt.splitlines():
+        line = line.strip()
+        # Empty lines and separators made of dashes:
+        if not line.strip("-"):
+            continue
+        match = _RE_LABELED_NUMBER.match(line)
+        if match is not None:
+            numbers_txt.append(match.group(1))
+            continue
+        if line.startswith(_LABEL_PREFIXES):
+            if line.startswith("PROJECT INFORMATION:"):
+                has_project_information = True
+            continue
+        numbers_txt.append(line)
+    input_txt = " ".join(numbers_txt)
 
     # After this preprocessing there should be only numbers:
-    if not re.match(r"^[ \t0-9\r\n]*$", input_txt):
+    if _RE_NOT_NUMBER.search(input_txt):
         print("Failed to remove garbage from the input file. Result after replace:")
         print(input_txt)
         sys.exit(1)
 
     # Convert the input into an iterator of numbers:
-    data = iter(int(x) for x in input_txt.split())
+    data = map(int, input_txt.split())
 
     # Problem dimensions:
     nb_jobs = next(data)
@@ -159,56 +192,59 @@ def define_model(filename: str) -> cp.Model:
     for _ in range(nb_non_renewable):
         skip_expected(data, 0)  # required capacity
 
+    # Bind frequently used functions to locals:
+    interval_var = model.interval_var
+    pulse = model.pulse
+
     # Parse job modes with durations and resource requirements:
     for j in range(nb_real_jobs):
         skip_expected(data, j + 2)  # jobID
         modes: list[cp.IntervalVar] = []  # Optional interval for each mode
 
-        renewable_requirements: list[list[int]] = [[] for _ in range(nb_resources)]
+        # Renewable requirements of all the modes, stored mode by mode in one
+        # array. Requirement of mode a on resource r is at a * nb_resources + r:
+        renewable_requirements = array("i")
         for a in range(nb_modes[j]):
             skip_expected(data, a + 1)  # mode
             duration = next(data)
-            mode = model.interval_var(
-                optional=True, length=duration, name=f"J{j + 1}M{a + 1}"
-            )
+            mode = interval_var(optional=True, length=duration, name=f"J{j + 1}M{a + 1}")
             modes.append(mode)
             total_c = 0
-            for r in range(nb_resources):
+            for _ in range(nb_resources):
                 c = next(data)
-                renewable_requirements[r].append(c)
+                renewable_requirements.append(c)
                 total_c += c
-            global_cumul.append(model.pulse(modes[a], total_c))
+            if use_global_cumul:
+                global_cumul.append(pulse(mode, total_c))
             total_c = 0
             for n in range(nb_non_renewable):
                 c = next(data)
                 non_renewables[n].append(mode.presence() * c)
                 total_c += c
-            global_non_renewable.append(mode.presence() * total_c)
+            if use_global_non_renewable:
+                global_non_renewable.append(mode.presence() * total_c)
 
         # Add cumulative pulses for renewable resources:
         for r in range(nb_resources):
-            min_c = renewable_requirements[r][0]
-            max_c = min_c
-            for a in range(1, nb_modes[j]):
-                min_c = min(min_c, renewable_requirements[r][a])
-                max_c = max(max_c, renewable_requirements[r][a])
+            requirements = renewable_requirements[r::nb_resources]
+            min_c = min(requirements)
+            max_c = max(requirements)
             if max_c == 0:
                 continue  # Job doesn't use this resource in any mode
             if min_c == max_c:
                 # All modes have the same requirement: use main job interval
-                cumuls[r].append(model.pulse(jobs[j], min_c))
-                redundant_cumuls[r].append(model.pulse(jobs[j], min_c))
+                cumuls[r].append(pulse(jobs[j], min_c))
+                if use_redundant_cumuls:
+                    redundant_cumuls[r].append(pulse(jobs[j], min_c))
                 continue
             # Variable requirement: add pulse for each mode interval
-            heights: list[cp.IntExpr] = []
-            for a in range(nb_modes[j]):
-                c = renewable_requirements[r][a]
-                heights.append(modes[a].presence() * c)
-                if c == 0:
-                    continue
-                cumuls[r].append(model.pulse(modes[a], c))
-            # Redundant: pulse on main interval with variable height
-            redundant_cumuls[r].append(model.pulse(jobs[j], model.sum(heights)))
+            for mode, c in zip(modes, requirements):
+                if c != 0:
+                    cumuls[r].append(pulse(mode, c))
+            if use_redundant_cumuls:
+                # Redundant: pulse on main interval with variable height
+                heights = [mode.presence() * c for mode, c in zip(modes, requirements)]
+                redundant_cumuls[r].append(pulse(jobs[j], model.sum(heights)))
 
         # Exactly one mode must be selected for each job:
         model.alternative(jobs[j], modes)
@@ -254,17 +290,43 @@ def define_model(filename: str) -> cp.Model:
     return model
 
 
+def get_int_option(name: str, default: int, args: list[str]) -> int:
+    """Parse an integer option from args list, removing it if found."""
+    if name in args:
+        idx = args.index(name)
+        value = int(args[idx + 1])
+        del args[idx : idx + 2]
+        return value
+    return default
+
+
+async def solve_in_parallel(
+    input_files: list[str], params: cp.Parameters, nb_parallel_runs: int
+) -> None:
+    """Solve the input files, with at most nb_parallel_runs solves running at the same time."""
+    # Each solver runs in its own process, the event loop only waits for them:
+    semaphore = asyncio.Semaphore(nb_parallel_runs)
+
+    async def solve(filename: str) -> None:
+        async with semaphore:
+            await cp.Solver().solve(define_model(filename), params)
+
+    await asyncio.gather(*(solve(filename) for filename in input_files))
+
+
 def main() -> None:
     global use_redundant_cumuls, use_global_cumul, use_global_non_renewable
 
     usage = (
         "Usage: python mmrcpsp.py [OPTIONS] INPUT_FILE [INPUT_FILE2] ..\n\n"
         "MMRCPSP options:\n"
-        "  --redundantCumuls     Add redundant cumulative constraints\n"
-        "  --globalCumul         Add global cumulative constraint\n"
-        "  --globalNonRenewable  Add global non-renewable resource constraint"
+        "  --redundantCumuls          Add redundant cumulative constraints\n"
+        "  --globalCumul              Add global cumulative constraint\n"
+        "  --globalNonRenewable       Add global non-renewable resource constraint\n"
+        "  --nbParallelRuns <number>  Number of input files solved in parallel (default: 1)"
     )
     params, rest_args = cp.parse_known_parameters(usage=usage)
+    nb_parallel_runs = get_int_option("--nbParallelRuns", 1, rest_args)
 
     # Filter custom options from rest_args:
     input_files: list[str] = []
@@ -283,8 +345,19 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    if nb_parallel_runs > 1:
+        asyncio.run(solve_in_parallel(input_files, params, nb_parallel_runs))
+        return
+
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, input_files[0])
+        for next_filename in input_files[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":
@@ -47,46 +47,55 @@ The solver auto-detects the format by checking if the third number is 0
 (indicating OR-Library format with machine IDs).
 """
 
+import asyncio
 import gzip
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
+from typing import Iterator
 
 import optalcp as cp
 
 
-def read_file_as_number_array(filename: str) -> list[int]:
-    """Read a file and parse whitespace-separated numbers."""
+def iter_numbers(filename: str) -> Iterator[int]:
+    """Read a file and parse whitespace-separated numbers, line by line."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            content = f.read()
-    else:
-        content = path.read_text()
-    return [int(x) for x in content.strip().split()]
+    # Numbers are generated while reading, the whole file is never kept in memory:
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        for line in f:
+            yield from map(int, line.split())
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(filename: str) -> str:
     """Generate model identifier from filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"non-permutation-flowshop_{instance}"
 
 
-def read_taillard_format(model: cp.Model, data: list[int]) -> None:
+def read_taillard_format(
+    model: cp.Model, nb_jobs: int, nb_machines: int, data: Iterator[int]
+) -> None:
     """Reads Taillard format (durations organized by machine)."""
-    it = iter(data)
-    nb_jobs = next(it)
-    nb_machines = next(it)
 
     last: list[cp.IntervalVar] = []  # Previous operation of each job
     for j in range(nb_machines):
         machine: list[cp.IntervalVar] = []
         for i in range(nb_jobs):
-            duration = next(it)
+            duration = next(data)
             operation = model.interval_var(length=duration, name=f"J{i + 1}M{j + 1}")
             machine.append(operation)
             # Precedence: operation must start after the previous operation of the same job:
@@ -96,18 +105,18 @@ def read_taillard_format(model: cp.Model, data: list[int]) -> None:
             else:
                 last.append(operation)
         # No-overlap: only one job at a time on each machine:
-        model.no_overlap(machine)
+        if len(machine) > 1:
+            model.no_overlap(machine)
 
     # Objective: minimize the makespan (max end time over all jobs):
     ends = [op.end() for op in last]
     model.minimize(model.max(ends))
 
 
-def read_or_library_format(model: cp.Model, data: list[int]) -> None:
+def read_or_library_format(
+    model: cp.Model, nb_jobs: int, nb_machines: int, data: Iterator[int]
+) -> None:
     """Reads OR-Library format (with machine IDs in input)."""
-    it = iter(data)
-    nb_jobs = next(it)
-    nb_machines = next(it)
 
     machines: list[list[cp.IntervalVar]] = [[] for _ in range(nb_machines)]
     ends: list[cp.IntExpr] = []
@@ -115,8 +124,8 @@ def read_or_library_format(model: cp.Model, data: list[int]) -> None:
     for i in range(nb_jobs):
         prev: cp.IntervalVar | None = None
         for j in range(nb_machines):
-            machine_id = next(it)
-            duration = next(it)
+            machine_id = next(data)
+            duration = next(data)
             operation = model.interval_var(
                 length=duration,
                 name=f"J{i + 1}O{j + 1}M{machine_id + 1}",
@@ -131,7 +140,8 @@ def read_or_library_format(model: cp.Model, data: list[int]) -> None:
 
     # No-overlap: only one job at a time on each machine:
     for j in range(nb_machines):
-        model.no_overlap(machines[j])
+        if len(machines[j]) > 1:
+            model.no_overlap(machines[j])
 
     # Objective: minimize the makespan (max end time over all jobs):
     model.minimize(model.max(ends))
@@ -139,31 +149,77 @@ def read_or_library_format(model: cp.Model, data: list[int]) -> None:
 
 def define_model(filename: str) -> cp.Model:
     """Define the non-permutation flowshop model."""
-    data = read_file_as_number_array(filename)
+    data = iter_numbers(filename)
     model = cp.Model(name=make_model_name(filename))
 
+    nb_jobs = next(data)
+    nb_machines = next(data)
+
     # Detect format: OR-Library format has machine ID (0) as the third number.
-    is_or_library_format = data[2] == 0
+    # The number is put back in front of the remaining data:
+    third = next(data)
+    is_or_library_format = third == 0
+    data = chain((third,), data)
 
     if is_or_library_format:
-        read_or_library_format(model, data)
+        read_or_library_format(model, nb_jobs, nb_machines, data)
     else:
-        read_taillard_format(model, data)
+        read_taillard_format(model, nb_jobs, nb_machines, data)
 
     return model
 
 
+def get_int_option(name: str, default: int, args: list[str]) -> int:
+    """Parse an integer option from args list, removing it if found."""
+    if name in args:
+        idx = args.index(name)
+        value = int(args[idx + 1])
+        del args[idx : idx + 2]
+        return value
+    return default
+
+
+async def solve_in_parallel(
+    input_files: list[str], params: cp.Parameters, nb_parallel_runs: int
+) -> None:
+    """Solve the input files, with at most nb_parallel_runs solves running at the same time."""
+    # Each solver runs in its own process, the event loop only waits for them:
+    semaphore = asyncio.Semaphore(nb_parallel_runs)
+
+    async def solve(filename: str) -> None:
+        async with semaphore:
+            await cp.Solver().solve(define_model(filename), params)
+
+    await asyncio.gather(*(solve(filename) for filename in input_files))
+
+
 def main() -> None:
-    usage = "Usage: python non-permutation-flowshop.py [OPTIONS] INPUT_FILE [INPUT_FILE2] .."
+    usage = (
+        "Usage: python non-permutation-flowshop.py [OPTIONS] INPUT_FILE [INPUT_FILE2] ..\n\n"
+        "Non-permutation flowshop options:\n"
+        "  --nbParallelRuns <number>  Number of input files solved in parallel (default: 1)"
+    )
     params, input_files = cp.parse_known_parameters(usage=usage)
+    nb_parallel_runs = get_int_option("--nbParallelRuns", 1, input_files)
 
     if not input_files:
         print(usage, file=sys.stderr)
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    if nb_parallel_runs > 1:
+        asyncio.run(solve_in_parallel(input_files, params, nb_parallel_runs))
+        return
+
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, input_files[0])
+        for next_filename in input_files[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":
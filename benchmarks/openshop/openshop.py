@@ -5,38 +5,47 @@ operation per machine. Operations of a job can run in any order but cannot
 overlap. Minimize makespan.
 """
 
+import asyncio
 import gzip
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator
 
 import optalcp as cp
 
 
-def read_file_as_number_array(filename: str) -> list[int]:
-    """Read a file and parse whitespace-separated numbers."""
+def iter_numbers(filename: str) -> Iterator[int]:
+    """Read a file and parse whitespace-separated numbers, line by line."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            content = f.read()
-    else:
-        content = path.read_text()
-    return [int(x) for x in content.strip().split()]
+    # Numbers are generated while reading, the whole file is never kept in memory:
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        for line in f:
+            yield from map(int, line.split())
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
 def define_model(filename: str) -> cp.Model:
     """Define the open shop scheduling model."""
-    data = iter(read_file_as_number_array(filename))
+    data = iter_numbers(filename)
     model = cp.Model(name=make_model_name("openshop", filename))
 
     nb_jobs = next(data)
@@ -69,10 +78,12 @@ def define_model(filename: str) -> cp.Model:
 
     # Tasks on each machine cannot overlap:
     for m in range(nb_machines):
-        model.no_overlap(machines[m])
+        if len(machines[m]) > 1:
+            model.no_overlap(machines[m])
     # Similarly operations of a job cannot overlap:
     for j in range(nb_jobs):
-        model.no_overlap(jobs[j])
+        if len(jobs[j]) > 1:
+            model.no_overlap(jobs[j])
 
     # Minimize the makespan:
     makespan = model.max(ends)
@@ -90,17 +101,57 @@ def define_model(filename: str) -> cp.Model:
     return model
 
 
+def get_int_option(name: str, default: int, args: list[str]) -> int:
+    """Parse an integer option from args list, removing it if found."""
+    if name in args:
+        idx = args.index(name)
+        value = int(args[idx + 1])
+        del args[idx : idx + 2]
+        return value
+    return default
+
+
+async def solve_in_parallel(
+    input_files: list[str], params: cp.Parameters, nb_parallel_runs: int
+) -> None:
+    """Solve the input files, with at most nb_parallel_runs solves running at the same time."""
+    # Each solver runs in its own process, the event loop only waits for them:
+    semaphore = asyncio.Semaphore(nb_parallel_runs)
+
+    async def solve(filename: str) -> None:
+        async with semaphore:
+            await cp.Solver().solve(define_model(filename), params)
+
+    await asyncio.gather(*(solve(filename) for filename in input_files))
+
+
 def main() -> None:
-    usage = "Usage: python openshop.py [OPTIONS] INPUT_FILE [INPUT_FILE2] .."
+    usage = (
+        "Usage: python openshop.py [OPTIONS] INPUT_FILE [INPUT_FILE2] ..\n\n"
+        "OpenShop options:\n"
+        "  --nbParallelRuns <number>  Number of input files solved in parallel (default: 1)"
+    )
     params, input_files = cp.parse_known_parameters(usage=usage)
+    nb_parallel_runs = get_int_option("--nbParallelRuns", 1, input_files)
 
     if not input_files:
         print(usage, file=sys.stderr)
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    if nb_parallel_runs > 1:
+        asyncio.run(solve_in_parallel(input_files, params, nb_parallel_runs))
+        return
+
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, input_files[0])
+        for next_filename in input_files[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":
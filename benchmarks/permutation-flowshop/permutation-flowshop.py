@@ -52,6 +52,7 @@ The solver auto-detects the format by checking if the third number is 0
 import gzip
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import optalcp as cp
@@ -61,20 +62,29 @@ def read_file_as_number_array(filename: str) -> list[int]:
     """Read a file and parse whitespace-separated numbers."""
     path = Path(filename)
     if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            content = f.read()
+        # The whole file is needed, so it is decompressed in a single call:
+        content = gzip.decompress(path.read_bytes()).decode()
     else:
         content = path.read_text()
-    return [int(x) for x in content.strip().split()]
+    # split() without arguments already ignores leading and trailing whitespace:
+    return list(map(int, content.split()))
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(filename: str) -> str:
     """Generate model identifier from filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"permutation-flowshop_{instance}"
 
 
@@ -90,27 +100,38 @@ def add_permutation_constraints(
     for i in range(nb_jobs):
         position_vars.append(model.int_var(name=f"position{i + 1}"))
 
+    # Bind frequently used functions to locals:
+    enforce = model.enforce
+    position = model.position
+
     # Create sequence variable for each machine and enforce permutation:
     for j in range(nb_machines):
         seq = model.sequence_var(machines[j])
         model.no_overlap(seq)
         for i in range(nb_jobs):
-            model.enforce(position_vars[i] == model.position(machines[j][i], seq))
+            enforce(position_vars[i] == position(machines[j][i], seq))
 
 
 def read_taillard_format(model: cp.Model, data: list[int]) -> None:
     """Read Taillard format (durations organized by machine)."""
-    it = iter(data)
-    nb_jobs = next(it)
-    nb_machines = next(it)
+    nb_jobs = data[0]
+    nb_machines = data[1]
+    # After the header, the durations form a matrix with one row per machine:
+    nb_numbers = 2 + nb_machines * nb_jobs
+    assert len(data) >= nb_numbers, "Unexpected end of data"
+    remaining = data[nb_numbers:]
+    assert len(remaining) == 0, f"Unexpected data at end: {remaining}"
 
     machines: list[list[cp.IntervalVar]] = [[] for _ in range(nb_machines)]
     last: list[cp.IntervalVar | None] = [None] * nb_jobs  # Previous operation of each job
 
+    # Bind frequently used function to a local:
+    interval_var = model.interval_var
+
     for j in range(nb_machines):
-        for i in range(nb_jobs):
-            duration = next(it)
-            operation = model.interval_var(length=duration, name=f"J{i + 1}M{j + 1}")
+        start = 2 + j * nb_jobs
+        for i, duration in enumerate(data[start : start + nb_jobs]):
+            operation = interval_var(length=duration, name=f"J{i + 1}M{j + 1}")
             machines[j].append(operation)
             # Precedence: operation must start after the previous operation of the same job:
             prev = last[i]
@@ -124,26 +145,31 @@ def read_taillard_format(model: cp.Model, data: list[int]) -> None:
     ends: list[cp.IntExpr] = [op.end() for op in last if op is not None]
     model.minimize(model.max(ends))
 
-    # Verify all input data was consumed:
-    remaining = list(it)
-    assert len(remaining) == 0, f"Unexpected data at end: {remaining}"
-
 
 def read_or_library_format(model: cp.Model, data: list[int]) -> None:
     """Read OR-Library format (with machine IDs in input)."""
-    it = iter(data)
-    nb_jobs = next(it)
-    nb_machines = next(it)
+    nb_jobs = data[0]
+    nb_machines = data[1]
+    # After the header, there is a row for each job with a (machine ID, duration)
+    # pair for each operation:
+    row_length = 2 * nb_machines
+    nb_numbers = 2 + nb_jobs * row_length
+    assert len(data) >= nb_numbers, "Unexpected end of data"
+    remaining = data[nb_numbers:]
+    assert len(remaining) == 0, f"Unexpected data at end: {remaining}"
 
     machines: list[list[cp.IntervalVar]] = [[] for _ in range(nb_machines)]
     ends: list[cp.IntExpr] = []
 
+    # Bind frequently used function to a local:
+    interval_var = model.interval_var
+
     for i in range(nb_jobs):
         prev: cp.IntervalVar | None = None
-        for j in range(nb_machines):
-            machine_id = next(it)
-            duration = next(it)
-            operation = model.interval_var(
+        start = 2 + i * row_length
+        row = data[start : start + row_length]
+        for j, (machine_id, duration) in enumerate(zip(row[0::2], row[1::2])):
+            operation = interval_var(
                 length=duration,
                 name=f"J{i + 1}O{j + 1}M{machine_id + 1}",
             )
@@ -160,10 +186,6 @@ def read_or_library_format(model: cp.Model, data: list[int]) -> None:
     # Objective: minimize the makespan (max end time over all jobs):
     model.minimize(model.max(ends))
 
-    # Verify all input data was consumed:
-    remaining = list(it)
-    assert len(remaining) == 0, f"Unexpected data at end: {remaining}"
-
 
 def define_model(filename: str) -> cp.Model:
     """Define the permutation flowshop model."""
@@ -190,8 +212,15 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, input_files[0])
+        for next_filename in input_files[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":
@@ -9,35 +9,43 @@ and production at activity end.
 import gzip
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator
 
 import optalcp as cp
 
 
-def read_file_as_number_array(filename: str) -> list[int]:
-    """Read a file and parse whitespace-separated numbers."""
+def iter_numbers(filename: str) -> Iterator[int]:
+    """Read a file and parse whitespace-separated numbers, line by line."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            content = f.read()
-    else:
-        content = path.read_text()
-    return [int(x) for x in content.strip().split()]
+    # Numbers are generated while reading, the whole file is never kept in memory:
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        for line in f:
+            yield from map(int, line.split())
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
 def define_model(filename: str) -> cp.Model:
     """Define the RCPSP-CPR model."""
-    data = iter(read_file_as_number_array(filename))
+    data = iter_numbers(filename)
     model = cp.Model(name=make_model_name("rcpsp-cpr", filename))
 
     # Read problem dimensions:
@@ -87,7 +95,8 @@ def define_model(filename: str) -> cp.Model:
         max_makespan += duration
         for r in range(nb_renewables):
             requirement = next(data)
-            renewables[r].append(jobs[j].pulse(requirement))
+            if requirement > 0:
+                renewables[r].append(jobs[j].pulse(requirement))
         for r in range(nb_reservoirs):
             consumption = next(data)
             production = next(data)
@@ -127,11 +136,11 @@ def define_model(filename: str) -> cp.Model:
 
     # Limit makespan to prevent propagation cycles, e.g., end_before_start(job1, job2)
     # but job2 is the only way to produce a reservoir needed for job1:
-    for j in range(nb_real_jobs):
-        jobs[j].end_max = max_makespan
+    for job in jobs:
+        job.end_max = max_makespan
 
-    # Minimize makespan:
-    model.minimize(model.max(ends))
+    # Minimize makespan (with a single last job, max of its end is not needed):
+    model.minimize(ends[0] if len(ends) == 1 else model.max(ends))
 
     return model
 
@@ -145,8 +154,15 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, input_files[0])
+        for next_filename in input_files[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":
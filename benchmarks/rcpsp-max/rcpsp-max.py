@@ -7,37 +7,45 @@ precedence constraints (minimum and maximum time lags).
 import gzip
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import optalcp as cp
 
 
-def read_file(filename: str) -> str:
-    """Read a file, handling gzip compression."""
-    path = Path(filename)
+def read_file(filename: str) -> bytes:
+    """Read a file as bytes, handling gzip compression."""
+    content = Path(filename).read_bytes()
     if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            return f.read()
-    return path.read_text()
+        # The whole file is needed, so it is decompressed in a single call:
+        return gzip.decompress(content)
+    return content
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
 def define_model(filename: str) -> cp.Model:
     """Define the RCPSP/max model."""
-    input_text = read_file(filename)
     # Input files contain characters '[' and ']'. Ignore them and convert the
-    # text into an array of numbers:
-    input_text = re.sub(r"[\[\]]", "", input_text)
-    data = iter([int(x) for x in input_text.strip().split()])
+    # rest into numbers. The input is never decoded, int() accepts bytes:
+    input_data = read_file(filename).translate(None, b"[]")
+    data = map(int, input_data.split())
 
     model = cp.Model(name=make_model_name("rcpsp-max", filename))
 
@@ -127,6 +135,9 @@ def define_model(filename: str) -> cp.Model:
     # variables:
     horizon = 0
 
+    # Bind frequently used function to a local:
+    pulse = model.pulse
+
     # Read durations and resource usage for real jobs
     for j in range(nb_real_jobs):
         assert next(data) == j + 1  # Job ID
@@ -140,11 +151,12 @@ def define_model(filename: str) -> cp.Model:
         jobs[j].length_max = duration
         for r in range(nb_resources):
             requirement = next(data)
-            resources[r].append(model.pulse(jobs[j], requirement))
+            if requirement > 0:
+                resources[r].append(pulse(jobs[j], requirement))
 
     # Apply computed horizon:
-    for j in range(nb_real_jobs):
-        jobs[j].end_max = horizon
+    for job in jobs:
+        job.end_max = horizon
 
     # Ignore resource requirements of the dummy sink job:
     assert next(data) == nb_real_jobs + 1  # Job ID
@@ -165,8 +177,8 @@ def define_model(filename: str) -> cp.Model:
     except StopIteration:
         pass
 
-    # Minimize makespan:
-    model.minimize(model.max(ends))
+    # Minimize makespan (with a single last job, max of its end is not needed):
+    model.minimize(ends[0] if len(ends) == 1 else model.max(ends))
 
     return model
 
@@ -180,8 +192,15 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, input_files[0])
+        for next_filename in input_files[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":
@@ -10,6 +10,7 @@ per-time-step capacity limits. Objective: minimize makespan.
 import gzip
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import optalcp as cp
@@ -19,23 +20,32 @@ def read_file(filename: str) -> str:
     """Read a file, handling .gz decompression."""
     path = Path(filename)
     if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            return f.read()
+        # The whole file is needed, so it is decompressed in a single call:
+        return gzip.decompress(path.read_bytes()).decode()
     return path.read_text()
 
 
 def read_file_as_number_array(filename: str) -> list[int]:
     """Read a file and parse whitespace-separated numbers."""
-    return [int(x) for x in read_file(filename).strip().split()]
+    # split() without arguments already ignores leading and trailing whitespace:
+    return list(map(int, read_file(filename).split()))
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
@@ -67,6 +77,9 @@ def define_model_rcp(filename: str) -> cp.Model:
     # Preparation for the makespan: array of end times of the last jobs
     ends: list[cp.IntExpr] = []
 
+    # Bind frequently used function to a local:
+    pulse = model.pulse
+
     # Read individual jobs
     for j in range(nb_real_jobs):
         duration = next(data)
@@ -74,7 +87,8 @@ def define_model_rcp(filename: str) -> cp.Model:
         jobs[j].length_max = duration
         for r in range(nb_resources):
             requirement = next(data)
-            cumuls[r].append(model.pulse(jobs[j], requirement))
+            if requirement > 0:
+                cumuls[r].append(pulse(jobs[j], requirement))
         nb_successors = next(data)
         is_last = True
         predecessor = jobs[j]
@@ -103,51 +117,71 @@ def define_model_rcp(filename: str) -> cp.Model:
     for r in range(nb_resources):
         model.enforce(model.sum(cumuls[r]) <= capacities[r])
 
-    # Minimize makespan:
-    model.minimize(model.max(ends))
+    # Minimize makespan (with a single last job, max of its end is not needed):
+    model.minimize(ends[0] if len(ends) == 1 else model.max(ends))
 
     return model
 
 
+# Lines of '.sm' files starting with these prefixes contain only labels (or data
+# not needed by the model) and are skipped by define_model_sm:
+_SM_LABEL_PREFIXES = (
+    "*",
+    "file with basedata",
+    "initial value random generator",
+    "RESOURCE",
+    "PROJECT INFORMATION:",
+    "pronr.",
+    "PRECEDENCE RELATIONS:",
+    "jobnr.",
+    "REQUESTS/DURATIONS:",
+    "R 1",
+)
+# Labeled lines of '.sm' files with a number that is kept:
+_RE_SM_LABELED_NUMBER = re.compile(
+    r"(?:projects *|jobs \(incl. supersource/sink \)|horizon *"
+    r"|- renewable *|- nonrenewable *|- doubly constrained *): *([0-9]*)"
+)
+# Any character that cannot be part of the preprocessed numbers:
+_RE_SM_NOT_NUMBER = re.compile(r"[^ 0-9]")
+
+
 def define_model_sm(filename: str) -> cp.Model:
     """Read RCPSP data file in '.sm' format."""
     model = cp.Model(name=make_model_name("rcpsp", filename))
 
-    # Read the whole file into memory and remove text labels:
-    input_txt = read_file(filename)
-    input_txt = re.sub(r"^\*\**$", "", input_txt, flags=re.MULTILINE)
-    input_txt = re.sub(r"file with basedata *: .*", "", input_txt)
-    input_txt = re.sub(r"initial value random generator: [0-9]*", "", input_txt)
-    input_txt = re.sub(r"projects +: {2}1", "", input_txt)
-    input_txt = re.sub(r"jobs \(incl. supersource/sink \): ", "", input_txt)
-    input_txt = re.sub(r"horizon *:", "", input_txt)
-    input_txt = re.sub(r"RESOURCES", "", input_txt)
-    input_txt = re.sub(r"- renewable *: *([0-9]*) *R", r"\1", input_txt)
-    input_txt = re.sub(r"- nonrenewable *: *0 *N", "", input_txt)
-    input_txt = re.sub(r"- doubly constrained *: *0 *D", "", input_txt)
-    input_txt = re.sub(r"PROJECT INFORMATION:", "", input_txt)
-    input_txt = re.sub(r"pronr\. *#jobs rel.date duedate tardcost *MPM-Time", "", input_txt)
-    input_txt = re.sub(r"PRECEDENCE RELATIONS:", "", input_txt)
-    input_txt = re.sub(r"jobnr. *#modes *#successors *successors", "", input_txt)
-    input_txt = re.sub(r"REQUESTS/DURATIONS:", "", input_txt)
-    input_txt = re.sub(r"jobnr. mode duration [ R0-9]*", "", input_txt)
-    input_txt = re.sub(r"^--*$", "", input_txt, flags=re.MULTILINE)
-    input_txt = re.sub(r"RESOURCEAVAILABILITIES:", "", input_txt)
-    input_txt = re.sub(r"^ *R 1 [ R0-9]*$", "", input_txt, flags=re.MULTILINE)
+    # Read the whole file into memory and remove text labels, keeping only
+    # numbers. The file is processed line by line in a single pass:
+    numbers_txt: list[str] = []
+    for line in read_file(filename).splitlines():
+        line = line.strip()
+        # Empty lines and separators made of dashes:
+        if not line.strip("-"):
+            continue
+        match = _RE_SM_LABELED_NUMBER.match(line)
+        if match is not None:
+            numbers_txt.append(match.group(1))
+            continue
+        if not line.startswith(_SM_LABEL_PREFIXES):
+            numbers_txt.append(line)
+    input_txt = " ".join(numbers_txt)
 
     # After this preprocessing there should be only numbers:
-    if not re.match(r"^[ 0-9\n]*$", input_txt):
+    if _RE_SM_NOT_NUMBER.search(input_txt):
         print("Failed to remove garbage from the input file. Result after replace:")
         print(input_txt)
         sys.exit(1)
 
     # Convert the input into an iterator of numbers:
-    data = iter(int(x) for x in input_txt.strip().split())
+    data = map(int, input_txt.split())
 
     # Read initial numbers at the beginning of the file:
+    assert next(data) == 1  # projects
     nb_jobs = next(data)
     next(data)  # horizon (unused)
     nb_resources = next(data)
+    assert next(data) == 0  # nonrenewable resources
+    assert next(data) == 0  # doubly constrained resources
     assert next(data) == 1  # pronr
     nb_real_jobs = next(data)
     assert next(data) == 0  # releaseDate
@@ -188,8 +222,8 @@ def define_model_sm(filename: str) -> cp.Model:
         if is_last:
             ends.append(predecessor.end())
 
-    # Minimize makespan:
-    model.minimize(model.max(ends))
+    # Minimize makespan (with a single last job, max of its end is not needed):
+    model.minimize(ends[0] if len(ends) == 1 else model.max(ends))
 
     # Skip dummy sink job (precedence):
     assert next(data) == nb_jobs  # jobID
@@ -206,6 +240,9 @@ def define_model_sm(filename: str) -> cp.Model:
     for _ in range(nb_resources):
         assert next(data) == 0  # required capacity
 
+    # Bind frequently used function to a local:
+    pulse = model.pulse
+
     # Parse job durations and resource requirements
     for j in range(nb_real_jobs):
         assert next(data) == j + 2  # jobID
@@ -217,7 +254,7 @@ def define_model_sm(filename: str) -> cp.Model:
         for r in range(nb_resources):
             c = next(data)
             if c > 0:
-                cumuls[r].append(model.pulse(job, c))
+                cumuls[r].append(pulse(job, c))
 
     # Skip dummy sink job (duration/resources):
     assert next(data) == nb_jobs  # jobID
@@ -259,8 +296,15 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, input_files[0])
+        for next_filename in input_files[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":
@@ -7,16 +7,17 @@ import gzip
 import math
 import sys
 from dataclasses import dataclass
+from operator import sub
 from pathlib import Path
+from typing import Callable, Iterator
 
 
-def read_file(filename: str) -> str:
-    """Read a file, handling .gz decompression."""
+def iter_lines(filename: str) -> Iterator[str]:
+    """Read a file line by line, handling .gz decompression."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            return f.read()
-    return path.read_text()
+    # Lines are generated while reading, the whole file is never kept in memory:
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        yield from f
 
 
 def to_radians(x: float) -> float:
@@ -28,7 +29,7 @@ def to_radians(x: float) -> float:
     return pi * (degrees + 5.0 * minutes / 3.0) / 180.0
 
 
-@dataclass
+@dataclass(slots=True)
 class ParseResult:
     """Result of parsing a TSPLIB file."""
 
@@ -42,7 +43,7 @@ class ParseResult:
     depots: list[int] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ParseParameters:
     """Parameters for parsing."""
 
@@ -57,8 +58,9 @@ def parse(filename: str, params: ParseParameters | None = None) -> ParseResult:
     if params is None:
         params = ParseParameters()
 
-    lines = read_file(filename).strip().split("\n")
-    pos = 0
+    # The file is parsed in a single pass. Sections read their data lines
+    # directly from the same iterator:
+    lines = iter_lines(filename)
     nb_nodes = -1
     edge_weight_type = ""
     problem_type = "UNKNOWN"
@@ -73,33 +75,31 @@ def parse(filename: str, params: ParseParameters | None = None) -> ParseResult:
     visit_duration = params.visit_duration
     force_ceil = params.force_ceil
 
-    while pos < len(lines):
-        line = lines[pos].strip()
+    for line in lines:
+        line = line.strip()
+
+        # Empty lines (e.g. at the end of the file) are ignored:
+        if not line:
+            continue
 
         if line.startswith("NAME"):
-            pos += 1
             continue
 
         if line.startswith("TYPE"):
             problem_type = line.split(":")[1].strip()
-            pos += 1
             continue
 
         if line.startswith("COMMENT"):
-            pos += 1
             continue
 
         if line.startswith("DIMENSION"):
             nb_nodes = int(line.split(":")[1])
-            pos += 1
             continue
 
         if line.startswith("DISPLAY_DATA_TYPE"):
-            pos += 1
             continue
 
         if line.startswith("DISTANCE"):
-            pos += 1
             continue
 
         if line.startswith("EDGE_WEIGHT_TYPE"):
@@ -112,21 +112,17 @@ def parse(filename: str, params: ParseParameters | None = None) -> ParseResult:
                 sys.exit(1)
             if force_ceil and edge_weight_type == "EUC_2D":
                 edge_weight_type = "CEIL_2D"
-            pos += 1
             continue
 
         if line.startswith("EDGE_WEIGHT_FORMAT"):
             edge_weight_format = line.split(":")[1].strip()
-            pos += 1
             continue
 
         if line.startswith("CAPACITY"):
             capacity = int(line.split(":")[1].strip())
-            pos += 1
             continue
 
         if line == "NODE_COORD_SECTION":
-            pos += 1
             assert edge_weight_type in [
                 "GEO",
                 "EUC_2D",
@@ -139,57 +135,69 @@ def parse(filename: str, params: ParseParameters | None = None) -> ParseResult:
 
             nodes: list[tuple[float, float]] = []
             for i in range(nb_nodes):
-                coord_data = [float(x) for x in lines[pos].split()]
-                pos += 1
+                coord_data = list(map(float, next(lines).split()))
                 assert len(coord_data) == 3, "Invalid input file format (node data)"
                 assert int(coord_data[0]) == i + 1, "Invalid input file format (node number)"
                 nodes.append((coord_data[1], coord_data[2]))
 
-            # Compute transition matrix
-            for i in range(nb_nodes):
-                row: list[int] = []
-                if edge_weight_type == "EUC_2D":
-                    # Euclidean distance, rounded to nearest integer
-                    for j in range(nb_nodes):
-                        dist_x = nodes[i][0] - nodes[j][0]
-                        dist_y = nodes[i][1] - nodes[j][1]
-                        row.append(round(math.sqrt(dist_x * dist_x + dist_y * dist_y)))
-                elif edge_weight_type == "CEIL_2D":
-                    # Euclidean distance, rounded up
-                    for j in range(nb_nodes):
-                        dist_x = nodes[i][0] - nodes[j][0]
-                        dist_y = nodes[i][1] - nodes[j][1]
-                        row.append(math.ceil(math.sqrt(dist_x * dist_x + dist_y * dist_y)))
-                elif edge_weight_type == "ATT":
-                    # Pseudo-Euclidean distance
-                    for j in range(nb_nodes):
-                        dist_x = nodes[i][0] - nodes[j][0]
-                        dist_y = nodes[i][1] - nodes[j][1]
-                        dist = math.sqrt((dist_x * dist_x + dist_y * dist_y) / 10.0)
-                        row.append(math.ceil(dist))
-                else:
-                    # GEO - geographical distance
-                    for j in range(nb_nodes):
-                        latitude_i = to_radians(nodes[i][0])
-                        longitude_i = to_radians(nodes[i][1])
-                        latitude_j = to_radians(nodes[j][0])
-                        longitude_j = to_radians(nodes[j][1])
-                        q1 = math.cos(longitude_i - longitude_j)
-                        q2 = math.cos(latitude_i - latitude_j)
-                        q3 = math.cos(latitude_i + latitude_j)
-                        dist = 6378.388 * math.acos(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)) + 1.0
-                        row.append(math.ceil(dist) if force_ceil else math.floor(dist))
-                transition_matrix.append(row)
+            # Compute transition matrix. All the distances are symmetric, so only
+            # the upper triangle is computed, by a list comprehension over the
+            # coordinates of the following nodes. The lower part of a row is
+            # column i of the rows already computed:
+            sqrt = math.sqrt
+            if edge_weight_type in ["EUC_2D", "CEIL_2D"]:
+                # Euclidean distance. EUC_2D is rounded to nearest integer and
+                # CEIL_2D is rounded up, otherwise they are the same:
+                round_distance: Callable[[float], int] = (
+                    round if edge_weight_type == "EUC_2D" else math.ceil
+                )
+                for i, (x1, y1) in enumerate(nodes):
+                    row = [previous[i] for previous in transition_matrix]
+                    row.append(0)
+                    row += [
+                        round_distance(sqrt((dx := x1 - x2) * dx + (dy := y1 - y2) * dy))
+                        for x2, y2 in nodes[i + 1 :]
+                    ]
+                    transition_matrix.append(row)
+            elif edge_weight_type == "ATT":
+                # Pseudo-Euclidean distance
+                ceil = math.ceil
+                for i, (x1, y1) in enumerate(nodes):
+                    row = [previous[i] for previous in transition_matrix]
+                    row.append(0)
+                    row += [
+                        ceil(sqrt(((dx := x1 - x2) * dx + (dy := y1 - y2) * dy) / 10.0))
+                        for x2, y2 in nodes[i + 1 :]
+                    ]
+                    transition_matrix.append(row)
+            else:
+                # GEO - geographical distance. The coordinates are converted to
+                # radians only once for every node:
+                radians = [(to_radians(x), to_radians(y)) for x, y in nodes]
+                # Bind frequently used functions to locals:
+                cos = math.cos
+                acos = math.acos
+                ceil = math.ceil
+                floor = math.floor
+                for i, (latitude_i, longitude_i) in enumerate(radians):
+                    row = [previous[i] for previous in transition_matrix]
+                    # The distance of a node to itself is not 0, so the diagonal
+                    # is computed too:
+                    for latitude_j, longitude_j in radians[i:]:
+                        q1 = cos(longitude_i - longitude_j)
+                        q2 = cos(latitude_i - latitude_j)
+                        q3 = cos(latitude_i + latitude_j)
+                        dist = 6378.388 * acos(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)) + 1.0
+                        row.append(ceil(dist) if force_ceil else floor(dist))
+                    transition_matrix.append(row)
             continue
 
         # Explicit distance matrix
         if line == "EDGE_WEIGHT_SECTION":
-            pos += 1
             if edge_weight_type == "EXPLICIT":
                 if edge_weight_format == "FULL_MATRIX":
                     for _ in range(nb_nodes):
-                        edge_data = [int(x) for x in lines[pos].split()]
-                        pos += 1
+                        edge_data = list(map(int, next(lines).split()))
                         assert (
                             len(edge_data) == nb_nodes
                         ), "Invalid input file matrix dimension format (edge data)"
@@ -197,8 +205,7 @@ def parse(filename: str, params: ParseParameters | None = None) -> ParseResult:
                 elif edge_weight_format == "UPPER_ROW":
                     rows: list[list[int]] = []
                     for i in range(nb_nodes - 1):
-                        upper_row_data = [int(x) for x in lines[pos].split()]
-                        pos += 1
+                        upper_row_data = list(map(int, next(lines).split()))
                         expected = nb_nodes - i - 1
                         assert (
                             len(upper_row_data) == expected
@@ -206,9 +213,9 @@ def parse(filename: str, params: ParseParameters | None = None) -> ParseResult:
                         rows.append(upper_row_data)
                     rows.append([])
                     for i in range(nb_nodes):
-                        row = []
-                        for j in range(i):
-                            row.append(transition_matrix[j][i])
+                        # The lower part of the row is column i of the rows
+                        # already built:
+                        row = [previous[i] for previous in transition_matrix]
                         row.append(0)
                         row.extend(rows[i])
                         transition_matrix.append(row)
@@ -219,11 +226,9 @@ def parse(filename: str, params: ParseParameters | None = None) -> ParseResult:
 
         # CVRP: customer demands
         if line == "DEMAND_SECTION":
-            pos += 1
             demands = []
             for i in range(nb_nodes):
-                demand_data = [int(x) for x in lines[pos].split()]
-                pos += 1
+                demand_data = list(map(int, next(lines).split()))
                 assert len(demand_data) == 2, "Invalid input file format (node data)"
                 assert demand_data[0] == i + 1, "Invalid input file format (node number)"
                 demands.append(demand_data[1])
@@ -231,21 +236,17 @@ def parse(filename: str, params: ParseParameters | None = None) -> ParseResult:
 
         # CVRP: depot locations
         if line == "DEPOT_SECTION":
-            pos += 1
             depots = []
-            while pos < len(lines):
-                depot = int(lines[pos])
-                pos += 1
+            for depot_line in lines:
+                depot = int(depot_line)
                 if depot == -1:
                     break
                 depots.append(depot - 1)  # Convert to 0-based index
             continue
 
         if line == "DISPLAY_DATA_SECTION":
-            pos += 1
             for i in range(nb_nodes):
-                display_data = lines[pos].split()
-                pos += 1
+                display_data = next(lines).split()
                 assert int(display_data[0]) == i + 1, "Invalid input file format (node number)"
             continue
 
@@ -260,44 +261,50 @@ def parse(filename: str, params: ParseParameters | None = None) -> ParseResult:
         for d in depots:
             assert demands[d] == 0, "Depot with non-zero demand"
 
-    # Check if the distance matrix is symmetric
+    # Check if the distance matrix is symmetric. Every row is compared with the
+    # corresponding column (as produced by zip) at once, only the first row
+    # that differs is searched for the asymmetric pair:
     has_direction_symmetry = True
-    for i in range(nb_nodes):
-        for j in range(nb_nodes):
-            if transition_matrix[i][j] != transition_matrix[j][i]:
-                if check_direction_symmetry:
-                    print(
-                        f"{filename}: Direction symmetry violated: {i} -> {j}: "
-                        f"{transition_matrix[i][j]}, {j} -> {i}: {transition_matrix[j][i]} "
-                        f"(EDGE_WEIGHT_TYPE: {edge_weight_type})",
-                        file=sys.stderr,
-                    )
-                has_direction_symmetry = False
-                break
-        if not has_direction_symmetry:
-            break
-
-    # Check triangular inequality
+    for i, column in enumerate(zip(*transition_matrix)):
+        row = transition_matrix[i]
+        if row == list(column):
+            continue
+        if check_direction_symmetry:
+            j = next(j for j in range(nb_nodes) if row[j] != column[j])
+            print(
+                f"{filename}: Direction symmetry violated: {i} -> {j}: "
+                f"{transition_matrix[i][j]}, {j} -> {i}: {transition_matrix[j][i]} "
+                f"(EDGE_WEIGHT_TYPE: {edge_weight_type})",
+                file=sys.stderr,
+            )
+        has_direction_symmetry = False
+        break
+
+    # Check triangular inequality. For nodes i and k, it is violated when
+    # tt[i][j] - tt[k][j] > tt[i][k] + visit_duration for some node j. So the
+    # maximum of the differences is computed for whole rows at once, and only a
+    # violating pair of rows is searched for the node j:
     if check_triangular_inequality:
         done = False
         for i in range(nb_nodes):
             if done:
                 break
+            row_i = transition_matrix[i]
             for k in range(nb_nodes):
-                if done:
-                    break
-                tt_ik = transition_matrix[i][k]
-                for j in range(nb_nodes):
-                    if transition_matrix[i][j] > tt_ik + visit_duration + transition_matrix[k][j]:
-                        print(
-                            f"{filename}: Triangular inequality violated: {i} -> {k} -> {j}: "
-                            f"{transition_matrix[i][j]} > {transition_matrix[i][k]} + "
-                            f"{visit_duration} + {transition_matrix[k][j]} "
-                            f"(EDGE_WEIGHT_TYPE: {edge_weight_type})",
-                            file=sys.stderr,
-                        )
-                        done = True
-                        break
+                row_k = transition_matrix[k]
+                tt_ik = row_i[k]
+                if max(map(sub, row_i, row_k)) <= tt_ik + visit_duration:
+                    continue
+                j = next(j for j in range(nb_nodes) if row_i[j] > tt_ik + visit_duration + row_k[j])
+                print(
+                    f"{filename}: Triangular inequality violated: {i} -> {k} -> {j}: "
+                    f"{transition_matrix[i][j]} > {transition_matrix[i][k]} + "
+                    f"{visit_duration} + {transition_matrix[k][j]} "
+                    f"(EDGE_WEIGHT_TYPE: {edge_weight_type})",
+                    file=sys.stderr,
+                )
+                done = True
+                break
 
     return ParseResult(
         type=problem_type,
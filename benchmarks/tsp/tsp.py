@@ -5,6 +5,7 @@ Traveling Salesman Problem (TSP): find the shortest cycle visiting all nodes exa
 
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import optalcp as cp
 from parsetsp import ParseParameters, parse
@@ -80,12 +81,11 @@ def define_model(filename: str) -> cp.Model:
         # we can break the symmetry by choosing any node and forcing it to be in
         # the first half of the cycle. Let's choose a node with the maximum
         # distance from node 0:
-        max_distance = 0
-        max_distance_node = 0
-        for i in range(1, nb_nodes):
-            if transition_matrix[0][i] > max_distance:
-                max_distance = transition_matrix[0][i]
-                max_distance_node = i
+        # The first node with the maximum distance is found by the builtins (node 0
+        # itself is used only when all the distances are 0):
+        distances = transition_matrix[0]
+        max_distance = max(distances[1:])
+        max_distance_node = distances.index(max_distance, 1) if max_distance > 0 else 0
         model.enforce(intervals[max_distance_node].end() * 2 <= last.end())
 
     return model
@@ -136,8 +136,15 @@ def main() -> None:
         print("Use --help for available options.", file=sys.stderr)
         sys.exit(1)
 
-    for filename in rest_args:
-        define_model(filename).solve(params)
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, rest_args[0])
+        for next_filename in rest_args[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":
@@ -9,43 +9,39 @@ import gzip
 import math
 import re
 import sys
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator
 
 import optalcp as cp
 
 
-def read_file(filename: str) -> str:
-    """Read a file, handling gzip compression."""
+def iter_lines(filename: str) -> Iterator[str]:
+    """Read a file line by line, handling gzip compression."""
     path = Path(filename)
-    if filename.endswith(".gz"):
-        with gzip.open(path, "rt") as f:
-            return f.read()
-    return path.read_text()
+    # Lines are generated while reading, the whole file is never kept in memory:
+    with gzip.open(path, "rt") if filename.endswith(".gz") else path.open() as f:
+        yield from f
+
+
+# Patterns used by make_model_name, compiled once:
+_RE_SEP = re.compile(r"[/\\]")
+_RE_DATA = re.compile(r"^data_")
+_RE_GZ = re.compile(r"\.gz$")
+_RE_JSON = re.compile(r"\.json$")
+_RE_EXT = re.compile(r"\...?$")
 
 
 def make_model_name(benchmark_name: str, filename: str) -> str:
     """Generate model identifier from benchmark name and filename."""
-    instance = re.sub(r"[/\\]", "_", filename)
-    instance = re.sub(r"^data_", "", instance)
-    instance = re.sub(r"\.gz$", "", instance)
-    instance = re.sub(r"\.json$", "", instance)
-    instance = re.sub(r"\...?$", "", instance)
+    instance = _RE_SEP.sub("_", filename)
+    instance = _RE_DATA.sub("", instance)
+    instance = _RE_GZ.sub("", instance)
+    instance = _RE_JSON.sub("", instance)
+    instance = _RE_EXT.sub("", instance)
     return f"{benchmark_name}_{instance}"
 
 
-@dataclass
-class Node:
-    """A node in the VRP-TW problem (depot or customer)."""
-
-    x: float
-    y: float
-    demand: int
-    ready: float  # Minimum start time
-    due: float  # Maximum start time
-    service_time: float  # Duration
-
-
 # Command line options (module-level for access in define_model):
 rounding = "ceil"
 objective_type = "makespan"
@@ -54,12 +50,24 @@ scale_factor = 1.0
 BIG_M = 1_000_000
 
 
-def verify_expected_line(lines: list[str], pos: int, expected: re.Pattern[str]) -> None:
-    """Verify that a line matches the expected pattern."""
-    if not expected.match(lines[pos].strip()):
+# Expected lines of the file header (used by define_model):
+_RE_EMPTY = re.compile(r"^$")
+_RE_VEHICLE = re.compile(r"^VEHICLE$")
+_RE_VEHICLE_HEADER = re.compile(r"^NUMBER\s+CAPACITY$")
+_RE_CUSTOMER = re.compile(r"^CUSTOMER$")
+_RE_CUSTOMER_HEADER = re.compile(
+    r"^CUST NO\.\s+XCOORD\.\s+YCOORD\.\s+DEMAND\s+"
+    r"READY TIME\s+DUE DATE\s+SERVICE\s+TIME$"
+)
+
+
+def verify_expected_line(lines: Iterator[str], pos: int, expected: re.Pattern[str]) -> None:
+    """Verify that the next line (with index pos) matches the expected pattern."""
+    line = next(lines).removesuffix("\n")
+    if not expected.match(line.strip()):
         print(
             f'Expected line {pos + 1} to match "{expected.pattern}", '
-            f'but got "{lines[pos]}"',
+            f'but got "{line}"',
             file=sys.stderr,
         )
         sys.exit(1)
@@ -67,101 +75,93 @@ def verify_expected_line(lines: list[str], pos: int, expected: re.Pattern[str])
 
 def define_model(filename: str) -> cp.Model:
     """Define the VRP-TW model."""
-    lines = read_file(filename).strip().split("\n")
-    # lines[0] is name of the instance. We ignore it and make the name from the filename
-    # lines[1] is an empty line, and then comes column names
-    verify_expected_line(lines, 1, re.compile(r"^$"))
-    verify_expected_line(lines, 2, re.compile(r"^VEHICLE$"))
-    verify_expected_line(lines, 3, re.compile(r"^NUMBER\s+CAPACITY$"))
-    parts = lines[4].strip().split()
+    lines = iter_lines(filename)
+    # Line 0 is name of the instance. We ignore it and make the name from the filename
+    next(lines)
+    # Line 1 is an empty line, and then comes column names
+    verify_expected_line(lines, 1, _RE_EMPTY)
+    verify_expected_line(lines, 2, _RE_VEHICLE)
+    verify_expected_line(lines, 3, _RE_VEHICLE_HEADER)
+    parts = next(lines).split()
     nb_vehicles = int(parts[0])
     capacity = int(parts[1])
-    verify_expected_line(lines, 5, re.compile(r"^$"))
+    verify_expected_line(lines, 5, _RE_EMPTY)
     # Then comes the customer data
-    verify_expected_line(lines, 6, re.compile(r"^CUSTOMER$"))
-    verify_expected_line(
-        lines,
-        7,
-        re.compile(
-            r"^CUST NO\.\s+XCOORD\.\s+YCOORD\.\s+DEMAND\s+"
-            r"READY TIME\s+DUE DATE\s+SERVICE\s+TIME$"
-        ),
-    )
-    verify_expected_line(lines, 8, re.compile(r"^$"))
-
-    nodes: list[Node] = []
-    # Note that due date is the maximum start time, not maximum end time.
-    # Because in the data, there are nodes with: ready + serviceTime > due.
-
-    for i in range(9, len(lines)):
-        parts = lines[i].strip().split()
-        customer_number = int(parts[0])
-        x = float(parts[1])
-        y = float(parts[2])
-        demand = int(parts[3])
-        ready = float(parts[4])
-        due = float(parts[5])
-        service_time = float(parts[6])
-
-        if customer_number != i - 9:
+    verify_expected_line(lines, 6, _RE_CUSTOMER)
+    verify_expected_line(lines, 7, _RE_CUSTOMER_HEADER)
+    verify_expected_line(lines, 8, _RE_EMPTY)
+
+    # The nodes are stored by columns, i.e., as parallel lists indexed by the node
+    # number (there is no object for every node). The lines are split first and
+    # then the columns are converted. Only the first 7 fields of a line are used
+    # (empty lines at the end of the file are skipped):
+    rows = [fields for line in lines if (fields := line.split()[:7])]
+    columns = list(zip(*rows, strict=True))
+    for i, customer_number in enumerate(map(int, columns[0])):
+        if customer_number != i:
             print(
-                f"Line {i + 1}: Expected customer number {i - 9}, "
-                f"but got {customer_number}",
+                f"Line {i + 10}: Expected customer number {i}, but got {customer_number}",
                 file=sys.stderr,
             )
             sys.exit(1)
-
-        nodes.append(
-            Node(
-                x=x * scale_factor,
-                y=y * scale_factor,
-                demand=demand,
-                ready=ready * scale_factor,
-                due=due * scale_factor,
-                service_time=service_time * scale_factor,
-            )
-        )
+    xs = [float(x) * scale_factor for x in columns[1]]
+    ys = [float(y) * scale_factor for y in columns[2]]
+    demands = list(map(int, columns[3]))
+    # Note that due date is the maximum start time, not maximum end time.
+    # Because in the data, there are nodes with: ready + serviceTime > due.
+    ready_times = [float(t) * scale_factor for t in columns[4]]  # Minimum start times
+    due_times = [float(t) * scale_factor for t in columns[5]]  # Maximum start times
+    service_times = [float(t) * scale_factor for t in columns[6]]  # Durations
 
     # Node 0 is the depot:
-    assert nodes[0].demand == 0
-    assert nodes[0].ready == 0
-    for i in range(1, len(nodes)):
-        assert nodes[i].demand > 0
+    assert demands[0] == 0
+    assert ready_times[0] == 0
+    for demand, service_time in zip(demands[1:], service_times[1:]):
+        assert demand > 0
         # Otherwise, we may have a problem with triangular inequality:
-        assert nodes[i].service_time > 0
+        assert service_time > 0
 
     # Compute transition matrix
     # The depot will not be part of noOverlap. It is known to be first and last
     # and so it will be handled separately. Therefore node 0 is not part of the matrix:
-    nb_nodes = len(nodes)
+    nb_nodes = len(xs)
     round_func = round if rounding == "round" else math.ceil
+    # Bind frequently used function to a local:
+    sqrt = math.sqrt
+    coordinates = list(zip(xs[1:], ys[1:]))
+    # The distances are symmetric. So only the upper triangle of each row is
+    # computed (in one comprehension), the rest is copied from the previous rows:
     customer_matrix: list[list[int]] = []
-    for i in range(1, nb_nodes):
-        row: list[int] = []
-        for j in range(1, nb_nodes):
-            xdist = nodes[i].x - nodes[j].x
-            ydist = nodes[i].y - nodes[j].y
-            dist = math.sqrt(xdist * xdist + ydist * ydist)
-            row.append(round_func(dist))
+    for i, (x1, y1) in enumerate(coordinates):
+        row = [previous[i] for previous in customer_matrix]
+        row.append(0)
+        row += [
+            round_func(sqrt((dx := x1 - x2) * dx + (dy := y1 - y2) * dy))
+            for x2, y2 in coordinates[i + 1 :]
+        ]
         customer_matrix.append(row)
 
     # For the depot, we need distances to all the customers:
-    depot_distances: list[int] = []
-    for i in range(1, nb_nodes):
-        xdist = nodes[0].x - nodes[i].x
-        ydist = nodes[0].y - nodes[i].y
-        dist = math.sqrt(xdist * xdist + ydist * ydist)
-        depot_distances.append(round_func(dist))
+    x0 = xs[0]
+    y0 = ys[0]
+    depot_distances = [
+        round_func(sqrt((dx := x0 - x) * dx + (dy := y0 - y) * dy)) for x, y in coordinates
+    ]
 
     model = cp.Model(name=make_model_name("vrp-tw", filename))
     nb_customers = nb_nodes - 1
     # From now on, we will index the customers from 0.
     # But in the variable names, we will index them from 1 (because node 0 in the
     # input file is the depot).
-    customer_nodes = nodes[1:]
+    customer_demands = demands[1:]
+    customer_ready_times = ready_times[1:]
+    customer_due_times = due_times[1:]
+    customer_service_times = service_times[1:]
 
     # For each customer, we have an array of potential visits by the vehicles:
     visits: list[list[cp.IntervalVar]] = [[] for _ in range(nb_customers)]
+    # For each vehicle, the presences of its potential visits:
+    vehicle_presences: list[list[cp.BoolExpr]] = []
     # For each vehicle, the time of the last visit:
     end_times: list[cp.IntExpr] = []
     # Load of each vehicle (how much capacity is used):
@@ -172,29 +172,43 @@ def define_model(filename: str) -> cp.Model:
     # Whether given vehicle is used or not:
     vehicle_used: list[cp.IntExpr] = []
 
+    # The time columns are converted to integers only once:
+    int_ready_times = list(map(int, customer_ready_times))
+    int_due_times = list(map(int, customer_due_times))
+    lengths = list(map(int, customer_service_times))
+
+    # The bounds of the visits are the same for all the vehicles. So they are
+    # computed only once, for each customer:
+    start_ranges: list[tuple[int, int]] = []
+    end_ranges: list[tuple[int, int]] = []
+    for i in range(nb_customers):
+        # The start time must be within the time window. But it cannot be
+        # before depot_distances[i], which is the minimum time necessary to get
+        # there (if it is the very first customer).
+        start_min = max(depot_distances[i], int_ready_times[i])
+        start_max = int_due_times[i]
+        # The range for the end time can also be computed from the time window
+        # and the visit duration.
+        # It is necessary only for objective_type === "traveltime"
+        length = lengths[i]
+        start_ranges.append((start_min, start_max))
+        end_ranges.append((start_min + length, start_max + length))
+
+    # Bind frequently used function to a local:
+    interval_var = model.interval_var
+
     for v in range(nb_vehicles):
         # Visits done by the vehicle v:
-        my_visits: list[cp.IntervalVar] = []
-        for i, node in enumerate(customer_nodes):
-            # The start time must be within the time window. But it cannot be
-            # before depot_distances[i], which is the minimum time necessary to get
-            # there (if it is the very first customer).
-            start_min = max(depot_distances[i], int(node.ready))
-            start_max = int(node.due)
-            # The range for the end time can also be computed from the time window
-            # and the visit duration.
-            # It is necessary only for objective_type === "traveltime"
-            end_min = start_min + int(node.service_time)
-            end_max = start_max + int(node.service_time)
-
-            visit = model.interval_var(
+        my_visits = [
+            interval_var(
                 name=f"V_{v + 1}_{i + 1}",
                 optional=True,
-                length=int(node.service_time),
-                start=(start_min, start_max),
-                end=(end_min, end_max),
+                length=lengths[i],
+                start=start_ranges[i],
+                end=end_ranges[i],
             )
-            my_visits.append(visit)
+            for i in range(nb_customers)
+        ]
 
         if objective_type == "traveltime":
             for i in range(nb_customers):
@@ -203,7 +217,7 @@ def define_model(filename: str) -> cp.Model:
                 # Length min, startMax, endMin and endMax remain the same.
                 my_visits[i].start_min = depot_distances[i]
                 my_visits[i].length_max = cp.LengthMax
-                assert my_visits[i].length_min == int(customer_nodes[i].service_time)
+                assert my_visits[i].length_min == lengths[i]
 
         # Add my_visits to the visits array:
         for i in range(nb_customers):
@@ -219,15 +233,14 @@ def define_model(filename: str) -> cp.Model:
             my_visits[i].end_before_start(last, depot_distances[i])
         end_times.append(last.end())
 
-        vehicle_used.append(model.max([itv.presence() for itv in my_visits]))
+        # Presence of each visit, shared by the expressions below:
+        presences = [itv.presence() for itv in my_visits]
+        vehicle_presences.append(presences)
+
+        vehicle_used.append(model.max(presences))
 
         # Capacity of the vehicle cannot be exceeded:
-        used = model.sum(
-            [
-                itv.presence() * customer_nodes[i].demand
-                for i, itv in enumerate(my_visits)
-            ]
-        )
+        used = model.sum([p * d for p, d in zip(presences, customer_demands)])
         model.enforce(used <= capacity)
         vehicle_load.append(used)
 
@@ -235,23 +248,25 @@ def define_model(filename: str) -> cp.Model:
         #    max_i { (i+1) * myVisits[i].presence() }
         # There is +1 to distinguish between serving no customer (value 0) and
         # serving just the customer with index 0 (value 1).
-        max_served_customer = model.max(
-            [itv.presence() * (i + 1) for i, itv in enumerate(my_visits)]
-        )
+        max_served_customer = model.max([p * (i + 1) for i, p in enumerate(presences)])
         max_served.append(max_served_customer)
 
+    # Transpose the presences to get, for each customer, the presences of its
+    # potential visits by the vehicles:
+    visit_presences = [list(presences) for presences in zip(*vehicle_presences)]
+
     for i in range(nb_customers):
         # Every customer must be visited exactly once:
         #    sum_j visits[i][j] == 1
         # We don't need alternative constraint.
-        model.enforce(model.sum([vis.presence() for vis in visits[i]]) == 1)
+        model.enforce(model.sum(visit_presences[i]) == 1)
 
     # All the demands must be satisfied by some vehicle. Therefore the sum of
     # their usage must be equal to the total demand. It is a redundant
     # constraint. It allows the solver to see a problem when some vehicles are
     # underused and there is no way to satisfy the remaining demands by the
     # remaining vehicles.
-    total_demand = sum(node.demand for node in customer_nodes)
+    total_demand = sum(customer_demands)
     model.enforce(model.sum(vehicle_load) == total_demand)
 
     if break_vehicle_symmetry:
@@ -277,7 +292,7 @@ def define_model(filename: str) -> cp.Model:
     elif objective_type == "nbvehicles":
         model.minimize(model.sum(vehicle_used))
     elif objective_type == "path":
-        total_service_time = sum(int(node.service_time) for node in customer_nodes)
+        total_service_time = sum(lengths)
         objective = model.sum(end_times) - total_service_time
         model.enforce(objective >= 0)
         model.minimize(objective)
@@ -359,8 +374,15 @@ def main() -> None:
         )
         sys.exit(1)
 
-    for filename in input_files:
-        define_model(filename).solve(params)
+    # The solver runs in a separate process. While it solves one model, the next
+    # one is read and defined in a background thread:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_model = executor.submit(define_model, input_files[0])
+        for next_filename in input_files[1:]:
+            model = next_model.result()
+            next_model = executor.submit(define_model, next_filename)
+            model.solve(params)
+        next_model.result().solve(params)
 
 
 if __name__ == "__main__":